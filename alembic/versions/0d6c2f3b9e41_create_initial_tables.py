@@ -0,0 +1,86 @@
+"""create initial tables
+
+Revision ID: 0d6c2f3b9e41
+Revises: 
+Create Date: 2025-05-28 15:40:12.214406
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0d6c2f3b9e41'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # the tables as the app first created them with create_all, later revisions build on them
+    op.create_table(
+        'users',
+        sa.Column('id', sa.UUID(), nullable=False),
+        sa.Column('name', sa.String(length=100), nullable=False),
+        sa.Column('email', sa.String(), nullable=False),
+        sa.Column('password', sa.String(), nullable=False),
+        sa.Column('location', sa.String(length=100), nullable=True),
+        sa.Column('created_at', sa.TIMESTAMP(), server_default=sa.text('now()'), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('email'),
+        sa.UniqueConstraint('email', name='unique_user_email'),
+    )
+    op.create_table(
+        'artists',
+        sa.Column('id', sa.UUID(), nullable=False),
+        sa.Column('name', sa.String(length=100), nullable=False),
+        sa.Column('ticketmaster_id', sa.String(), nullable=True),
+        sa.Column('created_at', sa.TIMESTAMP(), server_default=sa.text('now()'), nullable=False),
+        sa.Column('last_synced_at', sa.TIMESTAMP(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_table(
+        'events',
+        sa.Column('id', sa.UUID(), nullable=False),
+        sa.Column('ticketmaster_id', sa.String(), nullable=True),
+        sa.Column('artist_id', sa.UUID(), nullable=True),
+        sa.Column('name', sa.String(length=200), nullable=False),
+        sa.Column('date', sa.TIMESTAMP(), nullable=True),
+        sa.Column('location', sa.String(length=200), nullable=True),
+        sa.Column('ticket_url', sa.String(), nullable=True),
+        sa.Column('created_at', sa.TIMESTAMP(), server_default=sa.text('now()'), nullable=False),
+        sa.ForeignKeyConstraint(['artist_id'], ['artists.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_table(
+        'interests',
+        sa.Column('id', sa.UUID(), nullable=False),
+        sa.Column('user_id', sa.UUID(), nullable=True),
+        sa.Column('artist_id', sa.UUID(), nullable=True),
+        sa.Column('created_at', sa.TIMESTAMP(), server_default=sa.text('now()'), nullable=False),
+        sa.ForeignKeyConstraint(['artist_id'], ['artists.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_table(
+        'saved_events',
+        sa.Column('id', sa.UUID(), nullable=False),
+        sa.Column('user_id', sa.UUID(), nullable=True),
+        sa.Column('event_id', sa.UUID(), nullable=True),
+        sa.Column('created_at', sa.TIMESTAMP(), server_default=sa.text('now()'), nullable=False),
+        sa.ForeignKeyConstraint(['event_id'], ['events.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('saved_events')
+    op.drop_table('interests')
+    op.drop_table('events')
+    op.drop_table('artists')
+    op.drop_table('users')
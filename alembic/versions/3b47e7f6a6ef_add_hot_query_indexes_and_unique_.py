@@ -0,0 +1,90 @@
+"""add hot query indexes and unique constraints
+
+Revision ID: 3b47e7f6a6ef
+Revises: 4a404fb0ef92
+Create Date: 2026-10-17 06:46:27.066757
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3b47e7f6a6ef'
+down_revision: Union[str, None] = '4a404fb0ef92'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _fold_duplicate_artists() -> None:
+    # point events and interests of duplicate Ticketmaster artists at the oldest row, then drop the rest
+    ranked = """
+        WITH ranked AS (
+            SELECT id, first_value(id) OVER (
+                PARTITION BY ticketmaster_id ORDER BY created_at, id
+            ) AS keep_id
+            FROM artists
+            WHERE ticketmaster_id IS NOT NULL
+        )
+    """
+    op.execute(ranked + """
+        UPDATE events SET artist_id = ranked.keep_id
+        FROM ranked
+        WHERE events.artist_id = ranked.id AND ranked.id <> ranked.keep_id
+    """)
+    op.execute(ranked + """
+        UPDATE interests SET artist_id = ranked.keep_id
+        FROM ranked
+        WHERE interests.artist_id = ranked.id AND ranked.id <> ranked.keep_id
+    """)
+    op.execute(ranked + """
+        DELETE FROM artists
+        USING ranked
+        WHERE artists.id = ranked.id AND ranked.id <> ranked.keep_id
+    """)
+
+
+def _delete_duplicate_links(table: str, left: str, right: str) -> None:
+    # keep the oldest row per pair
+    op.execute(f"""
+        DELETE FROM {table}
+        USING (
+            SELECT id, row_number() OVER (
+                PARTITION BY {left}, {right} ORDER BY created_at, id
+            ) AS position
+            FROM {table}
+        ) AS ranked
+        WHERE {table}.id = ranked.id AND ranked.position > 1
+    """)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    _fold_duplicate_artists()
+    _delete_duplicate_links("interests", "user_id", "artist_id")
+    _delete_duplicate_links("saved_events", "user_id", "event_id")
+
+    # get-or-create lookups by Ticketmaster id
+    op.create_unique_constraint("unique_artist_ticketmaster_id", "artists", ["ticketmaster_id"])
+    # follow checks and the user's interests / saved events lists
+    op.create_unique_constraint("unique_interest_user_artist", "interests", ["user_id", "artist_id"])
+    op.create_unique_constraint("unique_saved_event_user_event", "saved_events", ["user_id", "event_id"])
+    # follower counts and cascading deletes from the artist / event side
+    op.create_index("ix_interests_artist_id", "interests", ["artist_id"])
+    op.create_index("ix_saved_events_event_id", "saved_events", ["event_id"])
+    # events of an artist, ordered and windowed by date
+    op.create_index("ix_events_artist_id_date", "events", ["artist_id", "date"])
+    op.create_index("ix_events_date", "events", ["date"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_events_date", table_name="events")
+    op.drop_index("ix_events_artist_id_date", table_name="events")
+    op.drop_index("ix_saved_events_event_id", table_name="saved_events")
+    op.drop_index("ix_interests_artist_id", table_name="interests")
+    op.drop_constraint("unique_saved_event_user_event", "saved_events", type_="unique")
+    op.drop_constraint("unique_interest_user_artist", "interests", type_="unique")
+    op.drop_constraint("unique_artist_ticketmaster_id", "artists", type_="unique")
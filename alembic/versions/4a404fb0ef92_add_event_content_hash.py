@@ -0,0 +1,29 @@
+"""add event content hash
+
+Revision ID: 4a404fb0ef92
+Revises: a354715672fe
+Create Date: 2026-10-17 06:45:40.995211
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4a404fb0ef92'
+down_revision: Union[str, None] = 'a354715672fe'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # hash of the Ticketmaster fields we store, rows without one are rewritten on their next sync
+    op.add_column('events', sa.Column('content_hash', sa.String(length=64), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('events', 'content_hash')
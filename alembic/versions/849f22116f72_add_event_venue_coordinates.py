@@ -0,0 +1,38 @@
+"""add event venue coordinates
+
+Revision ID: 849f22116f72
+Revises: a6605658822f
+Create Date: 2026-10-17 06:58:19.647528
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '849f22116f72'
+down_revision: Union[str, None] = 'a6605658822f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # filled in by the next sync of each artist, the content hash now covers the coordinates
+    op.add_column('events', sa.Column('latitude', sa.Float(), nullable=True))
+    op.add_column('events', sa.Column('longitude', sa.Float(), nullable=True))
+    op.add_column('events', sa.Column('geo_cell', sa.String(length=12), nullable=True))
+    op.create_index(
+        'ix_events_geo_cell', 'events', ['geo_cell'], unique=False,
+        postgresql_ops={'geo_cell': 'varchar_pattern_ops'}
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_events_geo_cell', table_name='events')
+    op.drop_column('events', 'geo_cell')
+    op.drop_column('events', 'longitude')
+    op.drop_column('events', 'latitude')
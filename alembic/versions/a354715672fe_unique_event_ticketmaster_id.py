@@ -0,0 +1,55 @@
+"""unique event ticketmaster id
+
+Revision ID: a354715672fe
+Revises: 52735c338b5d
+Create Date: 2026-10-17 06:41:31.830177
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a354715672fe'
+down_revision: Union[str, None] = '52735c338b5d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # fold duplicate Ticketmaster events into the oldest row, keeping saved events pointed at it
+    op.execute("""
+        WITH ranked AS (
+            SELECT id, first_value(id) OVER (
+                PARTITION BY ticketmaster_id ORDER BY created_at, id
+            ) AS keep_id
+            FROM events
+            WHERE ticketmaster_id IS NOT NULL
+        )
+        UPDATE saved_events
+        SET event_id = ranked.keep_id
+        FROM ranked
+        WHERE saved_events.event_id = ranked.id AND ranked.id <> ranked.keep_id
+    """)
+    op.execute("""
+        WITH ranked AS (
+            SELECT id, first_value(id) OVER (
+                PARTITION BY ticketmaster_id ORDER BY created_at, id
+            ) AS keep_id
+            FROM events
+            WHERE ticketmaster_id IS NOT NULL
+        )
+        DELETE FROM events
+        USING ranked
+        WHERE events.id = ranked.id AND ranked.id <> ranked.keep_id
+    """)
+    # required by the INSERT ... ON CONFLICT (ticketmaster_id) upsert in sync_events_route
+    op.create_unique_constraint("unique_event_ticketmaster_id", "events", ["ticketmaster_id"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint("unique_event_ticketmaster_id", "events", type_="unique")
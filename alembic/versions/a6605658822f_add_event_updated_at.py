@@ -0,0 +1,29 @@
+"""add event updated_at
+
+Revision ID: a6605658822f
+Revises: 3b47e7f6a6ef
+Create Date: 2026-10-17 06:56:05.825384
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a6605658822f'
+down_revision: Union[str, None] = '3b47e7f6a6ef'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # row version for ETags, existing rows start at the migration time
+    op.add_column('events', sa.Column('updated_at', sa.TIMESTAMP(), server_default=sa.text('now()'), nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('events', 'updated_at')
@@ -1,7 +1,7 @@
 """add is_admin to users
 
 Revision ID: a7721ad1709e
-Revises: 
+Revises: 0d6c2f3b9e41
 Create Date: 2025-05-28 15:51:40.950770
 
 """
@@ -11,7 +11,7 @@ import sqlalchemy as sa
 
 # revision identifiers, used by Alembic.
 revision = 'a7721ad1709e'
-down_revision = None
+down_revision = '0d6c2f3b9e41'
 branch_labels = None
 depends_on = None
 
@@ -1,6 +1,5 @@
-from passlib.context import CryptContext
 from datetime import datetime, timedelta, UTC
-from jose import jwt, JWTError
+import functools
 import os
 from dotenv import load_dotenv
 
@@ -9,20 +8,37 @@ load_dotenv()
 SECRET_KEY = os.getenv("SECRET_KEY")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60
+# bcrypt cost factor, hashes made with another cost are upgraded on the next login
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
 
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# passlib and jose are imported on first use, they're slow to import and
+# passlib is only needed in the password pool processes
+
+
+@functools.cache
+def pwd_context():
+    from passlib.context import CryptContext
+
+    return CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=BCRYPT_ROUNDS)
 
 
 def hash_password(password: str) -> str:
-    return pwd_context.hash(password)
+    return pwd_context().hash(password)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    return pwd_context().verify(plain_password, hashed_password)
+
+
+def verify_and_update_password(plain_password: str, hashed_password: str):
+    """Verify a password and, if its hash uses outdated settings, return a fresh hash as well."""
+    return pwd_context().verify_and_update(plain_password, hashed_password)
 
 
 def create_access_token(data: dict, expires_delta: timedelta = None):
+    from jose import jwt
+
     to_encode = data.copy()
     expire = datetime.now(UTC) + (expires_delta if expires_delta else timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES))
     to_encode.update({"exp": expire})
@@ -30,6 +46,8 @@ def create_access_token(data: dict, expires_delta: timedelta = None):
 
 
 def verify_access_token(token: str):
+    from jose import jwt, JWTError
+
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         return payload
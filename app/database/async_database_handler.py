@@ -0,0 +1,477 @@
+"""The handlers of database_handler for an AsyncSession, used with DB_ASYNC=true.
+
+Same names, arguments and results; keep both modules in step. Statement
+helpers that do no IO are shared with database_handler.
+"""
+from sqlalchemy import delete, func, or_, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.models import User, Artist, Event, Interest, SavedEvent
+from app.schemas.schemas import (
+    UserCreate, UserUpdate,
+    ArtistCreate, ArtistUpdate,
+    EventCreate, EventUpdate,
+    InterestCreate, InterestUpdate,
+    SavedEventCreate, SavedEventUpdate,
+    SyncReport
+)
+import uuid
+from typing import Optional
+from uuid import UUID
+from datetime import datetime, timezone
+from app.auth import hash_password
+from app.database.database_handler import (
+    FEED_WINDOW, MAX_SYNCED_EVENTS, UPSERTED_EVENT_COLUMNS, advisory_lock_key, event_content_hash,
+    event_coordinates, event_time_now, missing_from_feed, nearest_events, nearby_events_query, parse_event_date,
+    saved_events_query, upsert_insert
+)
+from app.database.pagination import DEFAULT_LIMIT, keyset_page, page_from_rows
+from app.services.principal_cache import invalidate_user_async
+from app.services.artist_index import artist_index
+
+
+async def _first(db: AsyncSession, stmt):
+    return (await db.scalars(stmt.limit(1))).first()
+
+async def _update_fields(db: AsyncSession, obj, data_in):
+    data = data_in.model_dump(exclude_unset=True)
+    for field, val in data.items():
+        setattr(obj, field, val)
+    await db.commit()
+    await db.refresh(obj)
+    return obj
+
+async def _delete(db: AsyncSession, obj):
+    await db.delete(obj)
+    await db.commit()
+    return obj
+
+
+# ----- User CRUD -----
+
+async def create_user(db: AsyncSession, user_data: UserCreate, hashed_password: Optional[str] = None):
+    hashed_pw = hashed_password or hash_password(user_data.password)
+    new_user = User(
+        id=uuid.uuid4(),
+        name=user_data.name,
+        email=user_data.email,
+        password=hashed_pw
+    )
+    db.add(new_user)
+    await db.commit()
+    await db.refresh(new_user)
+    return new_user
+
+async def get_users(db: AsyncSession, limit: int = DEFAULT_LIMIT, cursor: Optional[str] = None):
+    stmt = keyset_page(select(User), User.created_at, User.id, cursor, limit)
+    return page_from_rows((await db.scalars(stmt)).all(), User.created_at, limit)
+
+async def get_user_by_id(db: AsyncSession, user_id: UUID):
+    return await _first(db, select(User).where(User.id == user_id))
+
+async def get_user_by_email(db: AsyncSession, email: str):
+    return await _first(db, select(User).where(User.email == email))
+
+async def set_user_password(db: AsyncSession, user: User, hashed_password: str):
+    user.password = hashed_password
+    await db.commit()
+    await db.refresh(user)
+    return user
+
+async def update_user(db: AsyncSession, user_id: UUID, user_in: UserUpdate):
+    user = await get_user_by_id(db, user_id)
+    if not user:
+        return None
+    user = await _update_fields(db, user, user_in)
+    await invalidate_user_async(db, user_id)
+    return user
+
+async def delete_user(db: AsyncSession, user_id: UUID):
+    user = await get_user_by_id(db, user_id)
+    if not user:
+        return None
+    user = await _delete(db, user)
+    await invalidate_user_async(db, user_id)
+    return user
+
+
+# ----- Artist CRUD -----
+
+async def create_artist(db: AsyncSession, artist_in: ArtistCreate):
+    new_artist = Artist(id=uuid.uuid4(), **artist_in.model_dump())
+    db.add(new_artist)
+    await db.commit()
+    await db.refresh(new_artist)
+    artist_index.add(new_artist.id, new_artist.name, new_artist.ticketmaster_id)
+    return new_artist
+
+async def get_artists(db: AsyncSession, limit: int = DEFAULT_LIMIT, cursor: Optional[str] = None):
+    stmt = keyset_page(select(Artist), Artist.created_at, Artist.id, cursor, limit)
+    return page_from_rows((await db.scalars(stmt)).all(), Artist.created_at, limit)
+
+async def get_artist_by_id(db: AsyncSession, artist_id: UUID):
+    return await _first(db, select(Artist).where(Artist.id == artist_id))
+
+async def get_artist_names(db: AsyncSession):
+    return (await db.execute(select(Artist.id, Artist.name, Artist.ticketmaster_id))).all()
+
+async def update_artist(db: AsyncSession, artist_id: UUID, artist_in: ArtistUpdate):
+    artist = await get_artist_by_id(db, artist_id)
+    if not artist:
+        return None
+    artist = await _update_fields(db, artist, artist_in)
+    artist_index.add(artist.id, artist.name, artist.ticketmaster_id)
+    return artist
+
+async def delete_artist(db: AsyncSession, artist_id: UUID):
+    artist = await get_artist_by_id(db, artist_id)
+    if not artist:
+        return None
+    artist = await _delete(db, artist)
+    artist_index.remove(artist_id)
+    return artist
+
+
+# ----- Event CRUD -----
+
+async def create_event(db: AsyncSession, event_in: EventCreate):
+    new_event = Event(id=uuid.uuid4(), **event_in.model_dump())
+    db.add(new_event)
+    await db.commit()
+    await db.refresh(new_event)
+    return new_event
+
+async def get_events(db: AsyncSession, limit: int = DEFAULT_LIMIT, cursor: Optional[str] = None):
+    stmt = keyset_page(select(Event), Event.date, Event.id, cursor, limit)
+    return page_from_rows((await db.scalars(stmt)).all(), Event.date, limit)
+
+async def get_event_by_id(db: AsyncSession, event_id: UUID):
+    return await _first(db, select(Event).where(Event.id == event_id))
+
+async def update_event(db: AsyncSession, event_id: UUID, event_in: EventUpdate):
+    event = await get_event_by_id(db, event_id)
+    if not event:
+        return None
+    return await _update_fields(db, event, event_in)
+
+async def delete_event(db: AsyncSession, event_id: UUID):
+    event = await get_event_by_id(db, event_id)
+    if not event:
+        return None
+    return await _delete(db, event)
+
+
+# ----- Interest CRUD -----
+
+async def create_interest(db: AsyncSession, interest_in: InterestCreate):
+    existing = await get_interest_for_user_artist(db, interest_in.user_id, interest_in.artist_id)
+    if existing:
+        return existing
+    # a concurrent request may have created it since, the unique constraint settles the race
+    await db.execute(
+        upsert_insert(db)(Interest)
+        .values(id=uuid.uuid4(), **interest_in.model_dump())
+        .on_conflict_do_nothing(index_elements=[Interest.user_id, Interest.artist_id])
+    )
+    await db.commit()
+    return await get_interest_for_user_artist(db, interest_in.user_id, interest_in.artist_id)
+
+async def get_interests(db: AsyncSession):
+    return (await db.scalars(select(Interest))).all()
+
+async def get_interests_for_user(
+    db: AsyncSession, user_id: UUID, limit: int = DEFAULT_LIMIT, cursor: Optional[str] = None
+):
+    stmt = keyset_page(
+        select(Interest).where(Interest.user_id == user_id), Interest.created_at, Interest.id, cursor, limit
+    )
+    return page_from_rows((await db.scalars(stmt)).all(), Interest.created_at, limit)
+
+async def get_interest_by_id(db: AsyncSession, interest_id: UUID):
+    return await _first(db, select(Interest).where(Interest.id == interest_id))
+
+async def get_interest_for_user_artist(db: AsyncSession, user_id: UUID, artist_id: UUID):
+    return await _first(db, select(Interest).filter_by(user_id=user_id, artist_id=artist_id))
+
+async def update_interest(db: AsyncSession, interest_id: UUID, interest_in: InterestUpdate):
+    interest = await get_interest_by_id(db, interest_id)
+    if not interest:
+        return None
+    return await _update_fields(db, interest, interest_in)
+
+async def delete_interest(db: AsyncSession, interest_id: UUID):
+    interest = await get_interest_by_id(db, interest_id)
+    if not interest:
+        return None
+    return await _delete(db, interest)
+
+
+# ----- SavedEvent CRUD -----
+
+async def create_saved_event(db: AsyncSession, saved_in: SavedEventCreate):
+    stmt = select(SavedEvent).filter_by(user_id=saved_in.user_id, event_id=saved_in.event_id)
+    existing = await _first(db, stmt)
+    if existing:
+        return existing
+    # a concurrent request may have created it since, the unique constraint settles the race
+    await db.execute(
+        upsert_insert(db)(SavedEvent)
+        .values(id=uuid.uuid4(), **saved_in.model_dump())
+        .on_conflict_do_nothing(index_elements=[SavedEvent.user_id, SavedEvent.event_id])
+    )
+    await db.commit()
+    return await _first(db, stmt)
+
+async def get_saved_events(db: AsyncSession):
+    return (await db.scalars(select(SavedEvent))).all()
+
+async def get_saved_events_for_user(
+    db: AsyncSession, user_id: UUID, limit: int = DEFAULT_LIMIT, cursor: Optional[str] = None,
+    expand: bool = False, upcoming_only: bool = False
+):
+    stmt = keyset_page(
+        saved_events_query(user_id, expand, upcoming_only), SavedEvent.created_at, SavedEvent.id, cursor, limit
+    )
+    return page_from_rows((await db.scalars(stmt)).all(), SavedEvent.created_at, limit)
+
+async def get_saved_event_by_id(db: AsyncSession, se_id: UUID):
+    return await _first(db, select(SavedEvent).where(SavedEvent.id == se_id))
+
+async def update_saved_event(db: AsyncSession, se_id: UUID, se_in: SavedEventUpdate):
+    se = await get_saved_event_by_id(db, se_id)
+    if not se:
+        return None
+    return await _update_fields(db, se, se_in)
+
+async def delete_saved_event(db: AsyncSession, se_id: UUID):
+    se = await get_saved_event_by_id(db, se_id)
+    if not se:
+        return None
+    return await _delete(db, se)
+
+
+# ----- Discovery helpers -----
+
+async def get_or_create_artist_by_ticketmaster_data(db: AsyncSession, artist_data: dict):
+    ticketmaster_id = artist_data.get("id")
+    name = artist_data.get("name")
+    if not ticketmaster_id or not name:
+        return None
+    stmt = select(Artist).where(Artist.ticketmaster_id == ticketmaster_id)
+    existing = await _first(db, stmt)
+    if existing:
+        return existing
+    # a concurrent follow may have created it since, the unique constraint settles the race
+    await db.execute(
+        upsert_insert(db)(Artist)
+        .values(id=uuid.uuid4(), name=name, ticketmaster_id=ticketmaster_id)
+        .on_conflict_do_nothing(index_elements=[Artist.ticketmaster_id])
+    )
+    await db.commit()
+    artist = await _first(db, stmt)
+    artist_index.add(artist.id, artist.name, artist.ticketmaster_id)
+    return artist
+
+async def get_or_create_event_by_ticketmaster_data(db: AsyncSession, artist_id: UUID, event_data: dict):
+    tm_id = event_data.get("id")
+    if not tm_id:
+        return None
+    existing = await _first(db, select(Event).where(Event.ticketmaster_id == tm_id))
+    if existing:
+        return existing
+    new_event = Event(
+        id=uuid.uuid4(),
+        ticketmaster_id=tm_id,
+        artist_id=artist_id,
+        name=event_data.get("name"),
+        date=parse_event_date(event_data.get("date")),
+        location=event_data.get("location"),
+        ticket_url=event_data.get("ticket_url"),
+        **event_coordinates(event_data),
+    )
+    db.add(new_event)
+    await db.commit()
+    await db.refresh(new_event)
+    return new_event
+
+async def get_events_for_artist(
+    db: AsyncSession, artist_id: UUID, limit: int = DEFAULT_LIMIT, cursor: Optional[str] = None
+):
+    stmt = keyset_page(select(Event).where(Event.artist_id == artist_id), Event.date, Event.id, cursor, limit)
+    return page_from_rows((await db.scalars(stmt)).all(), Event.date, limit)
+
+async def get_artist_events_version(db: AsyncSession, artist_id: UUID):
+    result = await db.execute(
+        select(Artist.last_synced_at, func.count(Event.id), func.max(Event.updated_at))
+        .outerjoin(Event, Event.artist_id == Artist.id)
+        .where(Artist.id == artist_id)
+        .group_by(Artist.id)
+    )
+    return result.first()
+
+async def get_upcoming_events_for_artist(db: AsyncSession, artist_id: UUID):
+    stmt = (
+        select(Event)
+        .where(Event.artist_id == artist_id)
+        .where(or_(Event.date.is_(None), Event.date >= event_time_now()))
+        .order_by(Event.date.asc().nulls_last(), Event.id)
+        .limit(MAX_SYNCED_EVENTS)
+    )
+    return (await db.scalars(stmt)).all()
+
+async def get_artists_by_ticketmaster_ids(db: AsyncSession, ticketmaster_ids: list[str]):
+    return (await db.scalars(select(Artist).where(Artist.ticketmaster_id.in_(ticketmaster_ids)))).all()
+
+async def follow_artists_by_ticketmaster_data(db: AsyncSession, user_id: UUID, artists_data: list[dict]):
+    by_tm_id = {artist["id"]: artist for artist in artists_data if artist.get("id") and artist.get("name")}
+    if not by_tm_id:
+        return {}
+    await db.execute(
+        upsert_insert(db)(Artist)
+        .values([
+            {"id": uuid.uuid4(), "name": artist["name"], "ticketmaster_id": tm_id}
+            for tm_id, artist in by_tm_id.items()
+        ])
+        .on_conflict_do_nothing(index_elements=[Artist.ticketmaster_id])
+    )
+    artists = await get_artists_by_ticketmaster_ids(db, list(by_tm_id))
+    followed = set(await db.scalars(
+        select(Interest.artist_id)
+        .where(Interest.user_id == user_id, Interest.artist_id.in_([artist.id for artist in artists]))
+    ))
+    new_ids = [artist.id for artist in artists if artist.id not in followed]
+    if new_ids:
+        await db.execute(
+            upsert_insert(db)(Interest)
+            .values([{"id": uuid.uuid4(), "user_id": user_id, "artist_id": artist_id} for artist_id in new_ids])
+            .on_conflict_do_nothing(index_elements=[Interest.user_id, Interest.artist_id])
+        )
+    await db.commit()
+
+    result = {}
+    for artist in artists:
+        artist_index.add(artist.id, artist.name, artist.ticketmaster_id)
+        result[artist.ticketmaster_id] = (artist, artist.id not in followed)
+    return result
+
+async def follow_artist_by_ticketmaster_data(db: AsyncSession, user_id: UUID, artist_data: dict):
+    artist = await get_or_create_artist_by_ticketmaster_data(db, artist_data)
+    await create_interest(db, InterestCreate(user_id=user_id, artist_id=artist.id))
+    await db.refresh(artist)
+    return artist
+
+async def upsert_events_for_artist(db: AsyncSession, artist_id: UUID, events_data: list[dict]):
+    rows = {}
+    for ev in events_data:
+        tm_id = ev.get("id")
+        if not tm_id:
+            continue
+        # ON CONFLICT can't touch the same row twice in one statement
+        rows[tm_id] = {
+            "id": uuid.uuid4(),
+            "ticketmaster_id": tm_id,
+            "artist_id": artist_id,
+            "name": ev.get("name"),
+            "date": parse_event_date(ev.get("date")),
+            "location": ev.get("location"),
+            "ticket_url": ev.get("ticket_url"),
+            **event_coordinates(ev),
+            "content_hash": event_content_hash(ev),
+        }
+    if not rows:
+        return []
+    stmt = upsert_insert(db)(Event).values(list(rows.values()))
+    # Events shared between artists stay with the artist that stored them first
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[Event.ticketmaster_id],
+        set_={
+            **{col: stmt.excluded[col] for col in UPSERTED_EVENT_COLUMNS},
+            "updated_at": func.now(),
+        },
+    ).returning(Event)
+    return list(await db.scalars(stmt, execution_options={"populate_existing": True}))
+
+async def store_changed_events(db: AsyncSession, artist_id: UUID, events_data: list[dict], report: SyncReport):
+    by_tm_id = {ev["id"]: ev for ev in events_data if ev.get("id")}
+    if not by_tm_id:
+        return []
+    result = await db.execute(
+        select(Event.ticketmaster_id, Event.content_hash).where(Event.ticketmaster_id.in_(list(by_tm_id)))
+    )
+    stored = dict(result.all())
+    changed = []
+    for tm_id, ev in by_tm_id.items():
+        if tm_id not in stored:
+            report.inserted += 1
+        elif stored[tm_id] != event_content_hash(ev):
+            report.updated += 1
+        else:
+            report.unchanged += 1
+            continue
+        changed.append(ev)
+    await upsert_events_for_artist(db, artist_id, changed)
+    return list(by_tm_id)
+
+async def remove_events_missing_from_feed(
+    db: AsyncSession, artist_id: UUID, seen_tm_ids: list[str], before: Optional[datetime] = None
+) -> int:
+    result = await db.execute(
+        delete(Event)
+        .where(*missing_from_feed(artist_id, seen_tm_ids, before))
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount
+
+async def mark_artist_synced(db: AsyncSession, artist: Artist, ticketmaster_ids: list[str]):
+    # Mark the sync time and commit the whole sync
+    artist.last_synced_at = datetime.now(timezone.utc)
+    await db.commit()
+
+    # Reload the synced rows in one query instead of lazily per event
+    if not ticketmaster_ids:
+        return []
+    loaded = {
+        event.ticketmaster_id: event
+        for event in await db.scalars(select(Event).where(Event.ticketmaster_id.in_(ticketmaster_ids)))
+    }
+    return [loaded[tm_id] for tm_id in dict.fromkeys(ticketmaster_ids) if tm_id in loaded]
+
+async def lock_artist_for_sync(db: AsyncSession, artist_id: UUID) -> bool:
+    if db.get_bind().dialect.name != "postgresql":
+        return False
+    await db.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": advisory_lock_key(artist_id)})
+    return True
+
+async def get_artists_due_for_sync(db: AsyncSession, due_before: datetime, limit: int = 500):
+    followers = func.count(Interest.id).label("followers")
+    result = await db.execute(
+        select(Artist, followers)
+        .join(Interest, Interest.artist_id == Artist.id)
+        .where(Artist.ticketmaster_id.isnot(None))
+        .where(or_(Artist.last_synced_at.is_(None), Artist.last_synced_at < due_before))
+        .group_by(Artist.id)
+        .order_by(Artist.last_synced_at.asc().nulls_first(), followers.desc())
+        .limit(limit)
+    )
+    return result.all()
+
+async def get_events_near(
+    db: AsyncSession, latitude: float, longitude: float, radius_km: float, limit: int = DEFAULT_LIMIT
+):
+    candidates = (await db.execute(nearby_events_query(latitude, longitude, radius_km))).all()
+    nearest = nearest_events(candidates, latitude, longitude, radius_km, limit)
+    if not nearest:
+        return []
+    ids = [event_id for event_id, _ in nearest]
+    events = {event.id: event for event in await db.scalars(select(Event).where(Event.id.in_(ids)))}
+    return [(events[event_id], distance) for event_id, distance in nearest if event_id in events]
+
+async def get_feed_for_user(db: AsyncSession, user_id: UUID, limit: int = DEFAULT_LIMIT, cursor: Optional[str] = None):
+    now = event_time_now()
+    stmt = (
+        select(Event)
+        .join(Interest, Interest.artist_id == Event.artist_id)
+        .where(Interest.user_id == user_id)
+        .where(Event.date >= now, Event.date < now + FEED_WINDOW)
+    )
+    stmt = keyset_page(stmt, Event.date, Event.id, cursor, limit, nullable=False)
+    return page_from_rows((await db.scalars(stmt)).all(), Event.date, limit)
@@ -0,0 +1,118 @@
+"""Awaitable database handlers for both database modes.
+
+Each handler takes the session it is given: an AsyncSession runs the
+async_database_handler version on the event loop, a sync Session runs the
+database_handler version on the threadpool. Routes and services call these
+and work unchanged with DB_ASYNC on or off.
+"""
+import functools
+from contextlib import asynccontextmanager
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+
+from app.database import async_database_handler, database_handler
+from app.database.database import DB_ASYNC, AsyncSessionLocal, SessionLocal
+
+
+def _awaitable(name: str):
+    sync_handler = getattr(database_handler, name)
+    async_handler = getattr(async_database_handler, name)
+
+    @functools.wraps(sync_handler)
+    async def handler(db, *args, **kwargs):
+        if isinstance(db, AsyncSession):
+            return await async_handler(db, *args, **kwargs)
+        return await run_in_threadpool(sync_handler, db, *args, **kwargs)
+
+    return handler
+
+
+def _session_method(name: str):
+    async def method(db, *args):
+        if isinstance(db, AsyncSession):
+            return await getattr(db, name)(*args)
+        return await run_in_threadpool(getattr(db, name), *args)
+
+    method.__name__ = name
+    return method
+
+
+commit = _session_method("commit")
+rollback = _session_method("rollback")
+refresh = _session_method("refresh")
+close = _session_method("close")
+
+
+@asynccontextmanager
+async def session_scope():
+    """A session of the configured kind for work outside a request, e.g. the scheduler."""
+    if DB_ASYNC:
+        async with AsyncSessionLocal() as db:
+            yield db
+    else:
+        db = SessionLocal()
+        try:
+            yield db
+        finally:
+            await close(db)
+
+
+# ----- User CRUD -----
+create_user = _awaitable("create_user")
+get_users = _awaitable("get_users")
+get_user_by_id = _awaitable("get_user_by_id")
+get_user_by_email = _awaitable("get_user_by_email")
+set_user_password = _awaitable("set_user_password")
+update_user = _awaitable("update_user")
+delete_user = _awaitable("delete_user")
+
+# ----- Artist CRUD -----
+create_artist = _awaitable("create_artist")
+get_artists = _awaitable("get_artists")
+get_artist_by_id = _awaitable("get_artist_by_id")
+get_artist_names = _awaitable("get_artist_names")
+update_artist = _awaitable("update_artist")
+delete_artist = _awaitable("delete_artist")
+
+# ----- Event CRUD -----
+create_event = _awaitable("create_event")
+get_events = _awaitable("get_events")
+get_event_by_id = _awaitable("get_event_by_id")
+update_event = _awaitable("update_event")
+delete_event = _awaitable("delete_event")
+
+# ----- Interest CRUD -----
+create_interest = _awaitable("create_interest")
+get_interests = _awaitable("get_interests")
+get_interests_for_user = _awaitable("get_interests_for_user")
+get_interest_by_id = _awaitable("get_interest_by_id")
+get_interest_for_user_artist = _awaitable("get_interest_for_user_artist")
+update_interest = _awaitable("update_interest")
+delete_interest = _awaitable("delete_interest")
+
+# ----- SavedEvent CRUD -----
+create_saved_event = _awaitable("create_saved_event")
+get_saved_events = _awaitable("get_saved_events")
+get_saved_events_for_user = _awaitable("get_saved_events_for_user")
+get_saved_event_by_id = _awaitable("get_saved_event_by_id")
+update_saved_event = _awaitable("update_saved_event")
+delete_saved_event = _awaitable("delete_saved_event")
+
+# ----- Discovery helpers -----
+get_or_create_artist_by_ticketmaster_data = _awaitable("get_or_create_artist_by_ticketmaster_data")
+get_or_create_event_by_ticketmaster_data = _awaitable("get_or_create_event_by_ticketmaster_data")
+get_events_for_artist = _awaitable("get_events_for_artist")
+get_artist_events_version = _awaitable("get_artist_events_version")
+get_upcoming_events_for_artist = _awaitable("get_upcoming_events_for_artist")
+follow_artist_by_ticketmaster_data = _awaitable("follow_artist_by_ticketmaster_data")
+get_artists_by_ticketmaster_ids = _awaitable("get_artists_by_ticketmaster_ids")
+follow_artists_by_ticketmaster_data = _awaitable("follow_artists_by_ticketmaster_data")
+upsert_events_for_artist = _awaitable("upsert_events_for_artist")
+store_changed_events = _awaitable("store_changed_events")
+remove_events_missing_from_feed = _awaitable("remove_events_missing_from_feed")
+mark_artist_synced = _awaitable("mark_artist_synced")
+lock_artist_for_sync = _awaitable("lock_artist_for_sync")
+get_artists_due_for_sync = _awaitable("get_artists_due_for_sync")
+get_feed_for_user = _awaitable("get_feed_for_user")
+get_events_near = _awaitable("get_events_near")
@@ -1,22 +1,120 @@
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+from typing import Union
 import os
 from dotenv import load_dotenv
+from app.database.pool import TimedAsyncQueuePool, TimedQueuePool, count_pool_events
 
 load_dotenv()
 
 DATABASE_URL = os.getenv("DATABASE_URL")
+# Serve requests from an asyncpg AsyncEngine instead of sync sessions on the threadpool
+DB_ASYNC = os.getenv("DB_ASYNC", "false").lower() == "true"
 
-engine = create_engine(DATABASE_URL)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Connection pool of each engine, per worker process
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+# Seconds to wait for a free connection before failing the request
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+# Replace connections older than this many seconds, before the server or a proxy drops them
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+# Test connections on checkout so a dropped one is replaced instead of failing the request
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+
+POOL_OPTIONS = {
+    "pool_size": DB_POOL_SIZE,
+    "max_overflow": DB_MAX_OVERFLOW,
+    "pool_timeout": DB_POOL_TIMEOUT,
+    "pool_recycle": DB_POOL_RECYCLE,
+    "pool_pre_ping": DB_POOL_PRE_PING,
+}
+
+# Either kind of session, the handlers in app.database.crud accept both
+DbSession = Union[Session, AsyncSession]
 
 Base = declarative_base()
 
 
+def async_database_url(database_url: str) -> str:
+    # The same database through its asyncio driver
+    url = make_url(database_url)
+    if url.get_backend_name() == "postgresql":
+        url = url.set(drivername="postgresql+asyncpg")
+    elif url.get_backend_name() == "sqlite":
+        url = url.set(drivername="sqlite+aiosqlite")
+    return url.render_as_string(hide_password=False)
+
+
+# Optional, derived from DATABASE_URL when the async engine is created
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL")
+
+# Engines are created on first use: creating one imports the database driver,
+# which importing the app (and every serverless cold start) shouldn't pay for
+_engine = None
+_async_engine = None
+
+_session_factory = sessionmaker(autocommit=False, autoflush=False)
+# Committed objects stay loaded, refreshing them implicitly would need IO outside an await
+_async_session_factory = async_sessionmaker(autoflush=False, expire_on_commit=False)
+
+
+def get_engine():
+    global _engine
+    if _engine is None:
+        _engine = create_engine(DATABASE_URL, poolclass=TimedQueuePool, **POOL_OPTIONS)
+        count_pool_events(_engine)
+    return _engine
+
+
+def get_async_engine():
+    global _async_engine
+    if _async_engine is None:
+        url = ASYNC_DATABASE_URL or async_database_url(DATABASE_URL)
+        _async_engine = create_async_engine(url, poolclass=TimedAsyncQueuePool, **POOL_OPTIONS)
+        count_pool_events(_async_engine.sync_engine)
+    return _async_engine
+
+
+def SessionLocal() -> Session:
+    return _session_factory(bind=get_engine())
+
+
+def AsyncSessionLocal() -> AsyncSession:
+    return _async_session_factory(bind=get_async_engine())
+
+
+async def dispose_engines() -> None:
+    """Close the pooled connections of the engines created so far."""
+    if _async_engine is not None:
+        await _async_engine.dispose()
+    if _engine is not None:
+        _engine.dispose()
+
+
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+def pool_stats() -> dict:
+    stats = {}
+    if _engine is not None:
+        stats["sync"] = _engine.pool.stats()
+    if _async_engine is not None:
+        stats["async"] = _async_engine.pool.stats()
+    return stats
+
+
+# The session dependency of every route, picked by DB_ASYNC
+get_session = get_async_db if DB_ASYNC else get_db
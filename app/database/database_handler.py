@@ -1,22 +1,33 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import func, literal, or_, select, text
+from sqlalchemy.orm import Session, contains_eager, joinedload
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from app.models.models import User, Artist, Event, Interest, SavedEvent
 from app.schemas.schemas import (
     UserCreate, UserUpdate,
     ArtistCreate, ArtistUpdate,
     EventCreate, EventUpdate,
     InterestCreate, InterestUpdate,
-    SavedEventCreate, SavedEventUpdate
+    SavedEventCreate, SavedEventUpdate,
+    SyncReport
 )
+import hashlib
+import json
 import uuid
+from typing import Optional
 from uuid import UUID
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 from app.auth import hash_password
+from app.database.pagination import DEFAULT_LIMIT, keyset_page, page_from_rows
+from app.services.principal_cache import invalidate_user
+from app.services import geo
+from app.services.artist_index import artist_index
 
 
 # ----- User CRUD -----
 
-def create_user(db: Session, user_data: UserCreate):
-    hashed_pw = hash_password(user_data.password)
+def create_user(db: Session, user_data: UserCreate, hashed_password: Optional[str] = None):
+    hashed_pw = hashed_password or hash_password(user_data.password)
     new_user = User(
         id=uuid.uuid4(),
         name=user_data.name,
@@ -28,12 +39,22 @@ def create_user(db: Session, user_data: UserCreate):
     db.refresh(new_user)
     return new_user
 
-def get_users(db: Session):
-    return db.query(User).all()
+def get_users(db: Session, limit: int = DEFAULT_LIMIT, cursor: Optional[str] = None):
+    stmt = keyset_page(select(User), User.created_at, User.id, cursor, limit)
+    return page_from_rows(db.scalars(stmt).all(), User.created_at, limit)
 
 def get_user_by_id(db: Session, user_id: UUID):
     return db.query(User).filter(User.id == user_id).first()
 
+def get_user_by_email(db: Session, email: str):
+    return db.query(User).filter(User.email == email).first()
+
+def set_user_password(db: Session, user: User, hashed_password: str):
+    user.password = hashed_password
+    db.commit()
+    db.refresh(user)
+    return user
+
 def update_user(db: Session, user_id: UUID, user_in: UserUpdate):
     user = get_user_by_id(db, user_id)
     if not user:
@@ -42,6 +63,7 @@ def update_user(db: Session, user_id: UUID, user_in: UserUpdate):
     for field, val in data.items():
         setattr(user, field, val)
     db.commit()
+    invalidate_user(db, user_id)
     db.refresh(user)
     return user
 
@@ -51,6 +73,7 @@ def delete_user(db: Session, user_id: UUID):
         return None
     db.delete(user)
     db.commit()
+    invalidate_user(db, user_id)
     return user
 
 
@@ -61,14 +84,19 @@ def create_artist(db: Session, artist_in: ArtistCreate):
     db.add(new_artist)
     db.commit()
     db.refresh(new_artist)
+    artist_index.add(new_artist.id, new_artist.name, new_artist.ticketmaster_id)
     return new_artist
 
-def get_artists(db: Session):
-    return db.query(Artist).all()
+def get_artists(db: Session, limit: int = DEFAULT_LIMIT, cursor: Optional[str] = None):
+    stmt = keyset_page(select(Artist), Artist.created_at, Artist.id, cursor, limit)
+    return page_from_rows(db.scalars(stmt).all(), Artist.created_at, limit)
 
 def get_artist_by_id(db: Session, artist_id: UUID):
     return db.query(Artist).filter(Artist.id == artist_id).first()
 
+def get_artist_names(db: Session):
+    return db.query(Artist.id, Artist.name, Artist.ticketmaster_id).all()
+
 def update_artist(db: Session, artist_id: UUID, artist_in: ArtistUpdate):
     artist = get_artist_by_id(db, artist_id)
     if not artist:
@@ -78,6 +106,7 @@ def update_artist(db: Session, artist_id: UUID, artist_in: ArtistUpdate):
         setattr(artist, field, val)
     db.commit()
     db.refresh(artist)
+    artist_index.add(artist.id, artist.name, artist.ticketmaster_id)
     return artist
 
 def delete_artist(db: Session, artist_id: UUID):
@@ -86,6 +115,7 @@ def delete_artist(db: Session, artist_id: UUID):
         return None
     db.delete(artist)
     db.commit()
+    artist_index.remove(artist_id)
     return artist
 
 
@@ -98,8 +128,9 @@ def create_event(db: Session, event_in: EventCreate):
     db.refresh(new_event)
     return new_event
 
-def get_events(db: Session):
-    return db.query(Event).all()
+def get_events(db: Session, limit: int = DEFAULT_LIMIT, cursor: Optional[str] = None):
+    stmt = keyset_page(select(Event), Event.date, Event.id, cursor, limit)
+    return page_from_rows(db.scalars(stmt).all(), Event.date, limit)
 
 def get_event_by_id(db: Session, event_id: UUID):
     return db.query(Event).filter(Event.id == event_id).first()
@@ -133,21 +164,33 @@ def create_interest(db: Session, interest_in: InterestCreate):
     ).first()
     if existing:
         return existing
-    new_interest = Interest(id=uuid.uuid4(), **interest_in.model_dump())
-    db.add(new_interest)
+    # a concurrent request may have created it since, the unique constraint settles the race
+    db.execute(
+        upsert_insert(db)(Interest)
+        .values(id=uuid.uuid4(), **interest_in.model_dump())
+        .on_conflict_do_nothing(index_elements=[Interest.user_id, Interest.artist_id])
+    )
     db.commit()
-    db.refresh(new_interest)
-    return new_interest
+    return db.query(Interest).filter_by(
+        user_id=interest_in.user_id,
+        artist_id=interest_in.artist_id
+    ).first()
 
 def get_interests(db: Session):
     return db.query(Interest).all()
 
-def get_interests_for_user(db: Session, user_id: UUID):
-    return db.query(Interest).filter(Interest.user_id == user_id).all()
+def get_interests_for_user(db: Session, user_id: UUID, limit: int = DEFAULT_LIMIT, cursor: Optional[str] = None):
+    stmt = keyset_page(
+        select(Interest).where(Interest.user_id == user_id), Interest.created_at, Interest.id, cursor, limit
+    )
+    return page_from_rows(db.scalars(stmt).all(), Interest.created_at, limit)
 
 def get_interest_by_id(db: Session, interest_id: UUID):
     return db.query(Interest).filter(Interest.id == interest_id).first()
 
+def get_interest_for_user_artist(db: Session, user_id: UUID, artist_id: UUID):
+    return db.query(Interest).filter_by(user_id=user_id, artist_id=artist_id).first()
+
 def update_interest(db: Session, interest_id: UUID, interest_in: InterestUpdate):
     interest = get_interest_by_id(db, interest_id)
     if not interest:
@@ -177,17 +220,43 @@ def create_saved_event(db: Session, saved_in: SavedEventCreate):
     ).first()
     if existing:
         return existing
-    new_saved = SavedEvent(id=uuid.uuid4(), **saved_in.model_dump())
-    db.add(new_saved)
+    # a concurrent request may have created it since, the unique constraint settles the race
+    db.execute(
+        upsert_insert(db)(SavedEvent)
+        .values(id=uuid.uuid4(), **saved_in.model_dump())
+        .on_conflict_do_nothing(index_elements=[SavedEvent.user_id, SavedEvent.event_id])
+    )
     db.commit()
-    db.refresh(new_saved)
-    return new_saved
+    return db.query(SavedEvent).filter_by(
+        user_id=saved_in.user_id,
+        event_id=saved_in.event_id
+    ).first()
 
 def get_saved_events(db: Session):
     return db.query(SavedEvent).all()
 
-def get_saved_events_for_user(db: Session, user_id: UUID):
-    return db.query(SavedEvent).filter(SavedEvent.user_id == user_id).all()
+def saved_events_query(user_id: UUID, expand: bool = False, upcoming_only: bool = False):
+    """A user's saved events, optionally of upcoming or undated events only.
+
+    With expand each row comes with its event and the event's artist, joined
+    into the same query.
+    """
+    stmt = select(SavedEvent).where(SavedEvent.user_id == user_id)
+    if upcoming_only:
+        stmt = stmt.join(SavedEvent.event).where(or_(Event.date.is_(None), Event.date >= event_time_now()))
+    if expand:
+        event = contains_eager(SavedEvent.event) if upcoming_only else joinedload(SavedEvent.event)
+        stmt = stmt.options(event.joinedload(Event.artist))
+    return stmt
+
+def get_saved_events_for_user(
+    db: Session, user_id: UUID, limit: int = DEFAULT_LIMIT, cursor: Optional[str] = None,
+    expand: bool = False, upcoming_only: bool = False
+):
+    stmt = keyset_page(
+        saved_events_query(user_id, expand, upcoming_only), SavedEvent.created_at, SavedEvent.id, cursor, limit
+    )
+    return page_from_rows(db.scalars(stmt).all(), SavedEvent.created_at, limit)
 
 def get_saved_event_by_id(db: Session, se_id: UUID):
     return db.query(SavedEvent).filter(SavedEvent.id == se_id).first()
@@ -222,11 +291,29 @@ def get_or_create_artist_by_ticketmaster_data(db: Session, artist_data: dict):
     existing = db.query(Artist).filter_by(ticketmaster_id=ticketmaster_id).first()
     if existing:
         return existing
-    new_artist = Artist(id=uuid.uuid4(), name=name, ticketmaster_id=ticketmaster_id)
-    db.add(new_artist)
+    # a concurrent follow may have created it since, the unique constraint settles the race
+    db.execute(
+        upsert_insert(db)(Artist)
+        .values(id=uuid.uuid4(), name=name, ticketmaster_id=ticketmaster_id)
+        .on_conflict_do_nothing(index_elements=[Artist.ticketmaster_id])
+    )
     db.commit()
-    db.refresh(new_artist)
-    return new_artist
+    artist = db.query(Artist).filter_by(ticketmaster_id=ticketmaster_id).first()
+    artist_index.add(artist.id, artist.name, artist.ticketmaster_id)
+    return artist
+
+def event_time_now() -> datetime:
+    """Now, comparable with events.date: a naive TIMESTAMP holding UTC."""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+def parse_event_date(date_str: Optional[str]):
+    if not date_str:
+        return None
+    parsed = datetime.fromisoformat(date_str.replace("Z", "+00:00"))
+    # events.date is naive UTC, asyncpg refuses aware values for it
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
 
 def get_or_create_event_by_ticketmaster_data(db: Session, artist_id: UUID, event_data: dict):
     tm_id = event_data.get("id")
@@ -235,23 +322,307 @@ def get_or_create_event_by_ticketmaster_data(db: Session, artist_id: UUID, event
     existing = db.query(Event).filter_by(ticketmaster_id=tm_id).first()
     if existing:
         return existing
-    date_str = event_data.get("date")
-    event_datetime = None
-    if date_str:
-        event_datetime = datetime.fromisoformat(date_str.replace("Z", "+00:00"))
     new_event = Event(
         id=uuid.uuid4(),
         ticketmaster_id=tm_id,
         artist_id=artist_id,
         name=event_data.get("name"),
-        date=event_datetime,
+        date=parse_event_date(event_data.get("date")),
         location=event_data.get("location"),
         ticket_url=event_data.get("ticket_url"),
+        **event_coordinates(event_data),
     )
     db.add(new_event)
     db.commit()
     db.refresh(new_event)
     return new_event
 
-def get_events_for_artist(db: Session, artist_id: UUID):
-    return db.query(Event).filter(Event.artist_id == artist_id).all()
+def get_events_for_artist(db: Session, artist_id: UUID, limit: int = DEFAULT_LIMIT, cursor: Optional[str] = None):
+    stmt = keyset_page(select(Event).where(Event.artist_id == artist_id), Event.date, Event.id, cursor, limit)
+    return page_from_rows(db.scalars(stmt).all(), Event.date, limit)
+
+def get_artist_events_version(db: Session, artist_id: UUID):
+    """What the artist's stored event listing depends on: last sync, event count and newest row version."""
+    return (
+        db.query(Artist.last_synced_at, func.count(Event.id), func.max(Event.updated_at))
+        .outerjoin(Event, Event.artist_id == Artist.id)
+        .filter(Artist.id == artist_id)
+        .group_by(Artist.id)
+        .first()
+    )
+
+# Ticketmaster won't page past 1000 events, so neither can a sync
+MAX_SYNCED_EVENTS = 1000
+
+def get_upcoming_events_for_artist(db: Session, artist_id: UUID):
+    """The artist's stored events that a sync would return: upcoming or undated, by date."""
+    return (
+        db.query(Event)
+        .filter(Event.artist_id == artist_id)
+        .filter(or_(Event.date.is_(None), Event.date >= event_time_now()))
+        .order_by(Event.date.asc().nulls_last(), Event.id)
+        .limit(MAX_SYNCED_EVENTS)
+        .all()
+    )
+
+def get_artists_by_ticketmaster_ids(db: Session, ticketmaster_ids: list[str]):
+    return db.query(Artist).filter(Artist.ticketmaster_id.in_(ticketmaster_ids)).all()
+
+def follow_artists_by_ticketmaster_data(db: Session, user_id: UUID, artists_data: list[dict]):
+    """Get or create many artists and follow them all in one transaction.
+
+    Returns {ticketmaster id: (artist, whether the user newly follows it)}.
+    """
+    by_tm_id = {artist["id"]: artist for artist in artists_data if artist.get("id") and artist.get("name")}
+    if not by_tm_id:
+        return {}
+    db.execute(
+        upsert_insert(db)(Artist)
+        .values([
+            {"id": uuid.uuid4(), "name": artist["name"], "ticketmaster_id": tm_id}
+            for tm_id, artist in by_tm_id.items()
+        ])
+        .on_conflict_do_nothing(index_elements=[Artist.ticketmaster_id])
+    )
+    artist_ids = [artist.id for artist in get_artists_by_ticketmaster_ids(db, list(by_tm_id))]
+    followed = {
+        row.artist_id
+        for row in db.query(Interest.artist_id).filter(Interest.user_id == user_id, Interest.artist_id.in_(artist_ids))
+    }
+    new_ids = [artist_id for artist_id in artist_ids if artist_id not in followed]
+    if new_ids:
+        db.execute(
+            upsert_insert(db)(Interest)
+            .values([{"id": uuid.uuid4(), "user_id": user_id, "artist_id": artist_id} for artist_id in new_ids])
+            .on_conflict_do_nothing(index_elements=[Interest.user_id, Interest.artist_id])
+        )
+    db.commit()
+
+    # Reload the committed artists in one query
+    result = {}
+    for artist in get_artists_by_ticketmaster_ids(db, list(by_tm_id)):
+        artist_index.add(artist.id, artist.name, artist.ticketmaster_id)
+        result[artist.ticketmaster_id] = (artist, artist.id not in followed)
+    return result
+
+def follow_artist_by_ticketmaster_data(db: Session, user_id: UUID, artist_data: dict):
+    artist = get_or_create_artist_by_ticketmaster_data(db, artist_data)
+    create_interest(db, InterestCreate(user_id=user_id, artist_id=artist.id))
+    db.refresh(artist)
+    return artist
+
+def upsert_insert(db: Session):
+    # INSERT ... ON CONFLICT is dialect specific, SQLite is only used for local benchmarks
+    if db.get_bind().dialect.name == "sqlite":
+        return sqlite_insert
+    return pg_insert
+
+# Columns a sync rewrites on events it already stored
+UPSERTED_EVENT_COLUMNS = (
+    "name", "date", "location", "ticket_url", "latitude", "longitude", "geo_cell", "content_hash"
+)
+
+def event_coordinates(event_data: dict) -> dict:
+    latitude, longitude = event_data.get("latitude"), event_data.get("longitude")
+    if latitude is None or longitude is None:
+        return {"latitude": None, "longitude": None, "geo_cell": None}
+    return {"latitude": latitude, "longitude": longitude, "geo_cell": geo.encode(latitude, longitude)}
+
+def event_content_hash(event_data: dict) -> str:
+    """Fingerprint of the Ticketmaster fields we store, to skip rewriting unchanged events."""
+    fields = {
+        key: event_data.get(key) for key in ("name", "date", "location", "ticket_url", "latitude", "longitude")
+    }
+    return hashlib.sha256(json.dumps(fields, sort_keys=True).encode()).hexdigest()
+
+def upsert_events_for_artist(db: Session, artist_id: UUID, events_data: list[dict]):
+    """Insert or update a batch of Ticketmaster events with a single statement.
+
+    Does not commit, so a whole sync can run inside one transaction.
+    """
+    rows = {}
+    for ev in events_data:
+        tm_id = ev.get("id")
+        if not tm_id:
+            continue
+        # ON CONFLICT can't touch the same row twice in one statement
+        rows[tm_id] = {
+            "id": uuid.uuid4(),
+            "ticketmaster_id": tm_id,
+            "artist_id": artist_id,
+            "name": ev.get("name"),
+            "date": parse_event_date(ev.get("date")),
+            "location": ev.get("location"),
+            "ticket_url": ev.get("ticket_url"),
+            **event_coordinates(ev),
+            "content_hash": event_content_hash(ev),
+        }
+    if not rows:
+        return []
+    stmt = upsert_insert(db)(Event).values(list(rows.values()))
+    # Events shared between artists stay with the artist that stored them first
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[Event.ticketmaster_id],
+        set_={
+            **{col: stmt.excluded[col] for col in UPSERTED_EVENT_COLUMNS},
+            "updated_at": func.now(),
+        },
+    ).returning(Event)
+    return list(db.scalars(stmt, execution_options={"populate_existing": True}))
+
+def store_changed_events(db: Session, artist_id: UUID, events_data: list[dict], report: SyncReport):
+    """Upsert only the events whose content hash changed and count them into report.
+
+    Returns the Ticketmaster ids of every event in the batch. Does not commit.
+    """
+    by_tm_id = {ev["id"]: ev for ev in events_data if ev.get("id")}
+    if not by_tm_id:
+        return []
+    stored = dict(
+        db.query(Event.ticketmaster_id, Event.content_hash)
+        .filter(Event.ticketmaster_id.in_(list(by_tm_id)))
+        .all()
+    )
+    changed = []
+    for tm_id, ev in by_tm_id.items():
+        if tm_id not in stored:
+            report.inserted += 1
+        elif stored[tm_id] != event_content_hash(ev):
+            report.updated += 1
+        else:
+            report.unchanged += 1
+            continue
+        changed.append(ev)
+    upsert_events_for_artist(db, artist_id, changed)
+    return list(by_tm_id)
+
+def missing_from_feed(artist_id: UUID, seen_tm_ids: list[str], before: Optional[datetime]) -> list:
+    conditions = [
+        Event.artist_id == artist_id,
+        Event.ticketmaster_id.isnot(None),
+        Event.ticketmaster_id.notin_(seen_tm_ids),
+        or_(Event.date.is_(None), Event.date >= event_time_now()),
+    ]
+    if before is not None:
+        # a truncated feed lists every event dated earlier, later ones may just be past the cut
+        conditions.append(Event.date < before)
+    return conditions
+
+def remove_events_missing_from_feed(
+    db: Session, artist_id: UUID, seen_tm_ids: list[str], before: Optional[datetime] = None
+) -> int:
+    """Delete the artist's upcoming Ticketmaster events that are no longer in the upstream feed.
+
+    The feed only lists upcoming events, so past events are kept as history.
+    Only call this after the complete feed was read; for a truncated feed
+    pass before, the latest date it listed, and later events are kept.
+    Does not commit.
+    """
+    return (
+        db.query(Event)
+        .filter(*missing_from_feed(artist_id, seen_tm_ids, before))
+        .delete(synchronize_session=False)
+    )
+
+def mark_artist_synced(db: Session, artist: Artist, ticketmaster_ids: list[str]):
+    # Mark the sync time and commit the whole sync
+    artist.last_synced_at = datetime.now(timezone.utc)
+    db.commit()
+
+    # Reload the synced rows in one query instead of lazily per event
+    if not ticketmaster_ids:
+        return []
+    loaded = {
+        event.ticketmaster_id: event
+        for event in db.query(Event).filter(Event.ticketmaster_id.in_(ticketmaster_ids)).all()
+    }
+    return [loaded[tm_id] for tm_id in dict.fromkeys(ticketmaster_ids) if tm_id in loaded]
+
+def advisory_lock_key(artist_id: UUID) -> int:
+    # pg advisory locks take a signed 64-bit key
+    return int.from_bytes(artist_id.bytes[:8], "big", signed=True)
+
+def lock_artist_for_sync(db: Session, artist_id: UUID) -> bool:
+    """Wait for and take a transaction-scoped advisory lock on syncing this artist.
+
+    Serialises syncs of one artist across workers and nodes. The lock is
+    released when the sync transaction commits or rolls back. Returns False
+    on databases without advisory locks.
+    """
+    if db.get_bind().dialect.name != "postgresql":
+        return False
+    db.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": advisory_lock_key(artist_id)})
+    return True
+
+def get_artists_due_for_sync(db: Session, due_before: datetime, limit: int = 500):
+    """Followed artists never synced or last synced before due_before, with their follower counts."""
+    followers = func.count(Interest.id).label("followers")
+    return (
+        db.query(Artist, followers)
+        .join(Interest, Interest.artist_id == Artist.id)
+        .filter(Artist.ticketmaster_id.isnot(None))
+        .filter(or_(Artist.last_synced_at.is_(None), Artist.last_synced_at < due_before))
+        .group_by(Artist.id)
+        .order_by(Artist.last_synced_at.asc().nulls_first(), followers.desc())
+        .limit(limit)
+        .all()
+    )
+
+def nearby_events_query(latitude: float, longitude: float, radius_km: float):
+    """Ids and coordinates of upcoming events around a point, a superset of those within radius_km."""
+    cells = geo.covering_cells(latitude, longitude, radius_km)
+    # inline the prefixes so prepared statements still plan index range scans
+    in_cells = or_(*(Event.geo_cell.like(literal(cell + "%", literal_execute=True)) for cell in cells))
+    min_lat, max_lat, lon_ranges = geo.bounding_box(latitude, longitude, radius_km)
+    stmt = (
+        select(Event.id, Event.latitude, Event.longitude)
+        .where(in_cells)
+        .where(Event.latitude.between(min_lat, max_lat))
+        .where(Event.date >= event_time_now())
+    )
+    if lon_ranges is not None:
+        stmt = stmt.where(or_(*(Event.longitude.between(west, east) for west, east in lon_ranges)))
+    return stmt
+
+def nearest_events(candidates, latitude: float, longitude: float, radius_km: float, limit: int):
+    """The candidate rows within radius_km, nearest first, as (event_id, distance_km) pairs."""
+    found = []
+    for event_id, event_latitude, event_longitude in candidates:
+        distance = geo.haversine_km(latitude, longitude, event_latitude, event_longitude)
+        if distance <= radius_km:
+            found.append((event_id, distance))
+    found.sort(key=lambda pair: pair[1])
+    return found[:limit]
+
+def get_events_near(db: Session, latitude: float, longitude: float, radius_km: float, limit: int = DEFAULT_LIMIT):
+    """Upcoming events within radius_km, nearest first, as (event, distance_km) pairs.
+
+    Distances are computed on ids and coordinates only; whole rows are
+    loaded just for the nearest limit events.
+    """
+    candidates = db.execute(nearby_events_query(latitude, longitude, radius_km)).all()
+    nearest = nearest_events(candidates, latitude, longitude, radius_km, limit)
+    if not nearest:
+        return []
+    ids = [event_id for event_id, _ in nearest]
+    events = {event.id: event for event in db.scalars(select(Event).where(Event.id.in_(ids)))}
+    return [(events[event_id], distance) for event_id, distance in nearest if event_id in events]
+
+# The upcoming window the feed covers
+FEED_WINDOW = timedelta(days=183)
+
+def get_feed_for_user(db: Session, user_id: UUID, limit: int = DEFAULT_LIMIT, cursor: Optional[str] = None):
+    """Upcoming events of every artist the user follows, by date, in one query.
+
+    Served by the interests (user_id, artist_id) unique index and a range
+    scan of events (artist_id, date) per followed artist.
+    """
+    now = event_time_now()
+    stmt = (
+        select(Event)
+        .join(Interest, Interest.artist_id == Event.artist_id)
+        .where(Interest.user_id == user_id)
+        .where(Event.date >= now, Event.date < now + FEED_WINDOW)
+    )
+    stmt = keyset_page(stmt, Event.date, Event.id, cursor, limit, nullable=False)
+    return page_from_rows(db.scalars(stmt).all(), Event.date, limit)
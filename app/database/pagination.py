@@ -0,0 +1,73 @@
+"""Keyset pagination over (sort column, id) with opaque cursors.
+
+A page is fetched with `WHERE (sort, id) > (last sort, last id)` instead of
+OFFSET, so every page costs the same index range scan no matter how deep the
+client has paged. The sort column may be nullable (events without a date);
+NULLs sort last.
+"""
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Optional
+from uuid import UUID
+
+from sqlalchemy import Select, and_, or_
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 200
+
+
+class InvalidCursor(ValueError):
+    """Raised for a cursor that wasn't produced by encode_cursor."""
+
+
+def encode_cursor(sort_value: Optional[datetime], row_id: UUID) -> str:
+    payload = {"s": sort_value.isoformat() if sort_value is not None else None, "id": str(row_id)}
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[Optional[datetime], UUID]:
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        sort_value = datetime.fromisoformat(payload["s"]) if payload["s"] is not None else None
+        return sort_value, UUID(payload["id"])
+    except (binascii.Error, ValueError, KeyError, TypeError) as exc:
+        raise InvalidCursor("Invalid cursor") from exc
+
+
+def keyset_page(
+    stmt: Select, sort_column, id_column, cursor: Optional[str], limit: int, nullable: Optional[bool] = None
+) -> Select:
+    """Restrict stmt to the page after cursor, fetching one extra row to detect a next page.
+
+    Pass nullable=False when stmt already excludes NULL sort values, so the
+    keyset condition stays a plain range the index can serve.
+    """
+    return keyset_after(stmt, sort_column, id_column, cursor, nullable).limit(limit + 1)
+
+
+def keyset_after(stmt: Select, sort_column, id_column, cursor: Optional[str], nullable: Optional[bool] = None) -> Select:
+    """Restrict stmt to the rows after cursor, in keyset order and without a limit."""
+    if nullable is None:
+        nullable = getattr(sort_column, "nullable", True)
+    if cursor:
+        sort_value, last_id = decode_cursor(cursor)
+        if sort_value is None:
+            stmt = stmt.where(and_(sort_column.is_(None), id_column > last_id))
+        else:
+            after = [sort_column > sort_value, and_(sort_column == sort_value, id_column > last_id)]
+            if nullable:
+                after.append(sort_column.is_(None))
+            stmt = stmt.where(or_(*after))
+    return stmt.order_by(sort_column.asc().nulls_last(), id_column.asc())
+
+
+def page_from_rows(rows: list, sort_column, limit: int) -> dict:
+    """Build the response envelope from the rows of a keyset_page query."""
+    items = rows[:limit]
+    next_cursor = None
+    if len(rows) > limit:
+        last = items[-1]
+        next_cursor = encode_cursor(getattr(last, sort_column.key), last.id)
+    return {"items": items, "next_cursor": next_cursor}
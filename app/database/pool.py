@@ -0,0 +1,86 @@
+"""Connection pools that record their own statistics.
+
+The pool classes time every checkout, including waits for a free
+connection and timeouts once the pool and its overflow are exhausted.
+Pool events count connects, checkins and invalidations. Together with the
+pool's live size, checked-out and overflow counts this shows exhaustion
+coming before requests start failing with QueuePool timeouts.
+"""
+import threading
+import time
+
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeout
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from app.services.timings import OperationTimings
+
+# Upper bounds in seconds of the checkout latency histogram buckets
+CHECKOUT_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0, float("inf"))
+
+
+class PoolCounters:
+    def __init__(self):
+        self.connects = 0
+        self.checkins = 0
+        self.invalidations = 0
+        self.timeouts = 0
+        self.checkout = OperationTimings(CHECKOUT_BUCKETS)
+        # sync sessions check out from threadpool workers
+        self._lock = threading.Lock()
+
+    def count(self, field: str) -> None:
+        with self._lock:
+            setattr(self, field, getattr(self, field) + 1)
+
+    def observe_checkout(self, seconds: float, timed_out: bool = False) -> None:
+        with self._lock:
+            self.checkout.observe(seconds)
+            if timed_out:
+                self.timeouts += 1
+
+
+class _TimedCheckout:
+    counters: PoolCounters
+
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            connection = super().connect()
+        except PoolTimeout:
+            self.counters.observe_checkout(time.perf_counter() - started, timed_out=True)
+            raise
+        self.counters.observe_checkout(time.perf_counter() - started)
+        return connection
+
+    def stats(self) -> dict:
+        counters = self.counters
+        return {
+            "size": self.size(),
+            "max_overflow": self._max_overflow,
+            "checked_out": self.checkedout(),
+            "checked_in": self.checkedin(),
+            "overflow": max(self.overflow(), 0),
+            "connects": counters.connects,
+            "checkins": counters.checkins,
+            "invalidations": counters.invalidations,
+            "timeouts": counters.timeouts,
+            "checkout": counters.checkout.stats(),
+        }
+
+
+# The counters live on the class so they survive engine.dispose() recreating the pool
+class TimedQueuePool(_TimedCheckout, QueuePool):
+    counters = PoolCounters()
+
+
+class TimedAsyncQueuePool(_TimedCheckout, AsyncAdaptedQueuePool):
+    counters = PoolCounters()
+
+
+def count_pool_events(engine) -> None:
+    """Count connects, checkins and invalidations of engine's timed pool."""
+    counters = engine.pool.counters
+    event.listen(engine, "connect", lambda *args: counters.count("connects"))
+    event.listen(engine, "checkin", lambda *args: counters.count("checkins"))
+    event.listen(engine, "invalidate", lambda *args: counters.count("invalidations"))
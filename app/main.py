@@ -1,29 +1,97 @@
-from fastapi import FastAPI, Depends, HTTPException, status, Security
+from fastapi import FastAPI, Depends, HTTPException, Query, Request, Response, status, Security
+from fastapi.responses import JSONResponse, PlainTextResponse
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm, SecurityScopes
-from sqlalchemy.orm import Session
+from contextlib import asynccontextmanager
+import asyncio
+import logging
+import math
+from typing import Optional
 from uuid import UUID
-from datetime import datetime, timedelta, timezone
+from datetime import timedelta
 
-from app.database.database import Base, engine, get_db
-from app.models.models import User, Interest, Artist
+from app.database.database import dispose_engines, get_session, DbSession
+from app.models.models import Artist
 from app.schemas.schemas import (
     UserCreate, UserResponse, UserUpdate, Token,
-    ArtistResponse, EventResponse
+    ArtistResponse, EventResponse, Page, PageParams, Principal,
+    FollowArtistsRequest, FollowArtistResult
 )
-from app.database.database_handler import (
-    create_user, get_users, get_user_by_id, update_user, delete_user,
-    get_or_create_artist_by_ticketmaster_data,
-    get_or_create_event_by_ticketmaster_data, get_events_for_artist
+from app.database import crud
+from app.database.pagination import DEFAULT_LIMIT, MAX_LIMIT, InvalidCursor
+from app.services.discovery_client import (
+    search_artist, get_upcoming_events, DiscoveryAPIError, DiscoveryUnavailable, start_client, close_client
 )
-from app.services.discoveryapi import search_artist, get_upcoming_events
-from app.auth import verify_password, create_access_token, verify_access_token
+from app.services.sync import is_recently_synced, sync_artist
+from app.services.http_cache import conditional_response, make_etag
+from app.services import metrics, profiling, scheduler, password_pool
+from app.services.principal_cache import principal_cache, start_invalidation_listener
+from app.services.artist_index import artist_index
+from app.services.follow import resolve_artists
+from app.database.database import DATABASE_URL
+from app.auth import create_access_token, verify_access_token
+
+logger = logging.getLogger(__name__)
+
+
+async def load_artist_index():
+    # Autocomplete answers from stored artists before going to Ticketmaster
+    try:
+        async with crud.session_scope() as db:
+            artist_index.load(await crud.get_artist_names(db))
+    except Exception:
+        logger.exception("Loading the artist index failed")
+
+
+# The schema is managed by Alembic (alembic upgrade head), startup doesn't touch it
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # every route is registered by now
+    metrics.instrument(app)
+    profiling.start_slow_query_log()
+    # Share one pooled keep-alive Ticketmaster client across all requests
+    await start_client()
+    # Loaded in the background so serving doesn't wait on the database,
+    # autocomplete falls back to Ticketmaster until it's ready
+    index_task = asyncio.create_task(load_artist_index())
+    scheduler_task = scheduler.start() if scheduler.SCHEDULER_ENABLED else None
+    stop_listener = start_invalidation_listener(DATABASE_URL)
+    yield
+    if stop_listener:
+        stop_listener.set()
+    if scheduler_task:
+        await scheduler.stop(scheduler_task)
+    index_task.cancel()
+    password_pool.shutdown()
+    await close_client()
+    await dispose_engines()
+
+
+app = FastAPI(lifespan=lifespan)
+
+
+@app.exception_handler(password_pool.PasswordPoolBusy)
+async def password_pool_busy_handler(request: Request, exc: password_pool.PasswordPoolBusy):
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": "Too many sign-ins in progress, try again shortly"},
+        headers={"Retry-After": "1"},
+    )
+
+
+@app.exception_handler(DiscoveryUnavailable)
+async def discovery_unavailable_handler(request: Request, exc: DiscoveryUnavailable):
+    # out of Ticketmaster quota or throttled, rather than an empty result
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": "Ticketmaster is unavailable, try again later"},
+        headers={"Retry-After": str(max(math.ceil(exc.retry_after), 1))},
+    )
 
-SYNC_THRESHOLD = timedelta(hours=12)
 
-# Initialize the database
-Base.metadata.create_all(bind=engine)
+@app.exception_handler(InvalidCursor)
+async def invalid_cursor_handler(request: Request, exc: InvalidCursor):
+    return JSONResponse(status_code=status.HTTP_400_BAD_REQUEST, content={"detail": str(exc)})
 
-app = FastAPI()
 # OAuth2 with scopes support
 oauth2_scheme = OAuth2PasswordBearer(
     tokenUrl="login",
@@ -31,66 +99,112 @@ oauth2_scheme = OAuth2PasswordBearer(
 )
 
 
-def get_current_user(
+async def get_current_user(
     security_scopes: SecurityScopes,
     token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db),
-) -> User:
+    db: DbSession = Depends(get_session),
+) -> Principal:
     # Prepare authenticate header value for errors
     if security_scopes.scopes:
         authenticate_value = f'Bearer scope="{security_scopes.scope_str}"'
     else:
         authenticate_value = "Bearer"
+    cached = principal_cache.get(token)
+    if cached:
+        user, token_scopes = cached
+    else:
+        user, token_scopes = await load_principal(token, db, authenticate_value)
+    # Check requested scopes vs token scopes
+    for scope in security_scopes.scopes:
+        if scope not in token_scopes:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Not enough permissions",
+                headers={"WWW-Authenticate": authenticate_value},
+            )
+    return user
+
+
+async def load_principal(token: str, db: DbSession, authenticate_value: str) -> tuple[Principal, list[str]]:
     # Decode and verify token
     payload = verify_access_token(token)
-    if not payload:
+    try:
+        user_id = UUID(payload.get("sub")) if payload else None
+    except (TypeError, ValueError):
+        user_id = None
+    if not user_id:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid token",
             headers={"WWW-Authenticate": authenticate_value},
         )
-    # Extract user ID and scopes
-    user_id = payload.get("sub")
     token_scopes = payload.get("scopes", [])
     # Fetch user
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await crud.get_user_by_id(db, user_id)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="User not found",
             headers={"WWW-Authenticate": authenticate_value},
         )
-    # Check requested scopes vs token scopes
-    for scope in security_scopes.scopes:
-        if scope not in token_scopes:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Not enough permissions",
-                headers={"WWW-Authenticate": authenticate_value},
-            )
-    return user
+    principal = Principal.model_validate(user)
+    principal_cache.set(token, principal, token_scopes, payload.get("exp"))
+    return principal, token_scopes
 
 
 async def get_current_admin(
-    current_user: User = Security(get_current_user, scopes=["admin"])
-) -> User:
+    current_user: Principal = Security(get_current_user, scopes=["admin"])
+) -> Principal:
     return current_user
 
 
-# Public auth endpoints
+async def is_admin_request(request: Request) -> bool:
+    # For checks outside a route's dependencies, e.g. X-Profile is honoured for admins only
+    try:
+        token = await oauth2_scheme(request)
+        async with crud.session_scope() as db:
+            await get_current_user(SecurityScopes(["admin"]), token, db)
+    except HTTPException:
+        return False
+    return True
+
+
+def get_page_params(
+    limit: int = Query(DEFAULT_LIMIT, ge=1, le=MAX_LIMIT),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+) -> PageParams:
+    return PageParams(limit=limit, cursor=cursor)
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics_route(request: Request):
+    # Prometheus text format, for the METRICS_TOKEN scraper or an admin
+    if not metrics.authorized(request.headers.get("Authorization")) and not await is_admin_request(request):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Metrics need METRICS_TOKEN or an admin")
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+
+# Public auth endpoints, bcrypt runs on the dedicated password pool
 @app.post("/signup", response_model=UserResponse)
-def signup(user_data: UserCreate, db: Session = Depends(get_db)):
-    existing = db.query(User).filter(User.email == user_data.email).first()
+async def signup(user_data: UserCreate, db: DbSession = Depends(get_session)):
+    existing = await crud.get_user_by_email(db, user_data.email)
     if existing:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Email already registered")
-    return create_user(db, user_data)
+    hashed_password = await password_pool.hash_password(user_data.password)
+    return await crud.create_user(db, user_data, hashed_password)
 
 
 @app.post("/login", response_model=Token)
-def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.email == form_data.username).first()
-    if not user or not verify_password(form_data.password, user.password):
+async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: DbSession = Depends(get_session)):
+    user = await crud.get_user_by_email(db, form_data.username)
+    if not user:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
+    valid, new_hash = await password_pool.verify_password(form_data.password, user.password)
+    if not valid:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
+    if new_hash:
+        # the configured bcrypt cost changed since this hash was made
+        await crud.set_user_password(db, user, new_hash)
     # Assign scopes based on is_admin flag
     scopes = []
     if user.is_admin:
@@ -103,135 +217,190 @@ def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depend
 
 
 @app.get("/me", response_model=UserResponse)
-def get_me(current_user: User = Depends(get_current_user)):
+async def get_me(current_user: Principal = Depends(get_current_user)):
     return current_user
 
 
+@app.get("/me/feed", response_model=Page[EventResponse])
+async def get_my_feed(
+    page: PageParams = Depends(get_page_params),
+    db: DbSession = Depends(get_session),
+    current_user: Principal = Depends(get_current_user)
+):
+    # Upcoming events of all followed artists for the next six months
+    return await crud.get_feed_for_user(db, current_user.id, page.limit, page.cursor)
+
+
 # Discovery + follow + sync routes (User-only)
 @app.get("/artists/search/{artist_name}", dependencies=[Depends(get_current_user)])
-def find_artist(artist_name: str):
-    results = search_artist(artist_name)
+async def find_artist(artist_name: str):
+    results = await search_artist(artist_name)
     if not results:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Artist not found")
     return results
 
 
+@app.get("/artists/autocomplete", dependencies=[Depends(get_current_user)])
+async def autocomplete_artist(
+    q: str = Query(..., min_length=2, max_length=100),
+    limit: int = Query(10, ge=1, le=25),
+):
+    # Stored artists first, Ticketmaster only for names nobody has followed yet
+    return artist_index.search(q, limit) or (await search_artist(q) or [])[:limit]
+
+
 @app.get("/artists/{artist_id}/discovery_events", dependencies=[Depends(get_current_user)])
-def find_events(artist_id: str):
-    return get_upcoming_events(artist_id) or []
+async def find_events(artist_id: str):
+    return await get_upcoming_events(artist_id) or []
 
 
 @app.post("/follow_artist/{artist_name}", response_model=ArtistResponse, dependencies=[Depends(get_current_user)])
-def follow_artist_route(
+async def follow_artist_route(
     artist_name: str,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: DbSession = Depends(get_session),
+    current_user: Principal = Depends(get_current_user)
 ):
-    raw = search_artist(artist_name)
+    raw = await search_artist(artist_name)
     if not raw:
         raise HTTPException(status_code=404, detail="Artist not found")
-    artist = get_or_create_artist_by_ticketmaster_data(db, raw[0])
-    link = db.query(Interest).filter_by(user_id=current_user.id, artist_id=artist.id).first()
-    if not link:
-        db.add(Interest(user_id=current_user.id, artist_id=artist.id))
-        db.commit()
-    return artist
+    return await crud.follow_artist_by_ticketmaster_data(db, current_user.id, raw[0])
 
 
-@app.post("/sync_events/{artist_id}", response_model=list[EventResponse], dependencies=[Depends(get_current_user)])
-def sync_events_route(
-    artist_id: UUID,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+@app.post("/follow_artists", response_model=list[FollowArtistResult])
+async def follow_artists_route(
+    body: FollowArtistsRequest,
+    db: DbSession = Depends(get_session),
+    current_user: Principal = Depends(get_current_user)
 ):
+    resolved = await resolve_artists(db, body.names, body.ticketmaster_ids)
+    followed = await crud.follow_artists_by_ticketmaster_data(
+        db, current_user.id, [data for _, data, _ in resolved if data]
+    )
+    results = []
+    for query, data, unresolved_status in resolved:
+        # Ticketmaster data without an id or name can't be stored
+        if data is None or data["id"] not in followed:
+            results.append(FollowArtistResult(query=query, status=unresolved_status or "failed"))
+            continue
+        artist, newly_followed = followed[data["id"]]
+        results.append(FollowArtistResult(
+            query=query,
+            status="followed" if newly_followed else "already_following",
+            artist=ArtistResponse.model_validate(artist),
+        ))
+    return results
+
+
+async def get_followed_artist(db: DbSession, user_id: UUID, artist_id: UUID) -> Artist:
     # Check if user follows the artist
-    link = db.query(Interest).filter_by(user_id=current_user.id, artist_id=artist_id).first()
+    link = await crud.get_interest_for_user_artist(db, user_id, artist_id)
     if not link:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Must follow to sync events")
 
     # Load the Artist record
-    artist = db.query(Artist).filter_by(id=artist_id).first()
+    artist = await crud.get_artist_by_id(db, artist_id)
     if not artist:
         raise HTTPException(status_code=404, detail="Artist not found")
+    return artist
 
-    # If data synced recently, just return data from DB
-    if artist.last_synced_at and (datetime.now(timezone.utc) - artist.last_synced_at) < SYNC_THRESHOLD:
-        return get_events_for_artist(db, artist_id)
-
-    # If not synced recently, fetch from Ticketmaster API
-    raw_events = get_upcoming_events(artist.ticketmaster_id) or []
-    synced = []
-    for ev in raw_events:
-        synced.append(get_or_create_event_by_ticketmaster_data(db, artist_id, ev))
-
-    # Mark the sync time
-    artist.last_synced_at = datetime.now(timezone.utc)
-    db.commit()
 
-    return synced
+@app.post("/sync_events/{artist_id}", response_model=list[EventResponse], dependencies=[Depends(get_current_user)])
+async def sync_events_route(
+    artist_id: UUID,
+    response: Response,
+    db: DbSession = Depends(get_session),
+    current_user: Principal = Depends(get_current_user)
+):
+    artist = await get_followed_artist(db, current_user.id, artist_id)
 
+    # If data synced recently (usually by the background scheduler), just return data from DB
+    if is_recently_synced(artist):
+        return await crud.get_upcoming_events_for_artist(db, artist_id)
 
-@app.get("/artists/{artist_id}/events", response_model=list[EventResponse], dependencies=[Depends(get_current_user)])
-def list_stored_events_route(
+    # If not synced recently, fetch from Ticketmaster API
+    try:
+        result = await sync_artist(db, artist)
+    except DiscoveryAPIError:
+        # Don't stamp an incomplete sync, serve what we already have
+        return await crud.get_upcoming_events_for_artist(db, artist_id)
+    for field, count in result.report.model_dump().items():
+        response.headers[f"X-Sync-{field.capitalize()}"] = str(count)
+    return result.events
+
+
+@app.get("/artists/{artist_id}/events", response_model=Page[EventResponse], dependencies=[Depends(get_current_user)])
+async def list_stored_events_route(
     artist_id: UUID,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    request: Request,
+    response: Response,
+    page: PageParams = Depends(get_page_params),
+    db: DbSession = Depends(get_session),
+    current_user: Principal = Depends(get_current_user)
 ):
-    link = db.query(Interest).filter_by(user_id=current_user.id, artist_id=artist_id).first()
+    link = await crud.get_interest_for_user_artist(db, current_user.id, artist_id)
     if not link:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Must follow to view events")
-    return get_events_for_artist(db, artist_id)
+    # Changes with every sync and every added, edited or removed event of the artist
+    version = await crud.get_artist_events_version(db, artist_id)
+    not_modified = conditional_response(request, response, make_etag(artist_id, *version, page.limit, page.cursor))
+    if not_modified:
+        return not_modified
+    return await crud.get_events_for_artist(db, artist_id, page.limit, page.cursor)
 
 
 # User management (Admin-only)
-@app.get("/users/", response_model=list[UserResponse], dependencies=[Depends(get_current_admin)])
-def list_users_route(db: Session = Depends(get_db)):
-    return get_users(db)
+@app.get("/users/", response_model=Page[UserResponse], dependencies=[Depends(get_current_admin)])
+async def list_users_route(page: PageParams = Depends(get_page_params), db: DbSession = Depends(get_session)):
+    return await crud.get_users(db, page.limit, page.cursor)
 
 @app.get("/users/{user_id}", response_model=UserResponse, dependencies=[Depends(get_current_admin)])
-def read_user_route(user_id: UUID, db: Session = Depends(get_db)):
-    user = get_user_by_id(db, user_id)
+async def read_user_route(user_id: UUID, db: DbSession = Depends(get_session)):
+    user = await crud.get_user_by_id(db, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     return user
 
 @app.patch("/users/{user_id}", response_model=UserResponse)
-def update_user_route(
+async def update_user_route(
     user_id: UUID,
     user_in: UserUpdate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: DbSession = Depends(get_session),
+    current_user: Principal = Depends(get_current_user)
 ):
     # allow if self or admin
     if not (current_user.is_admin or current_user.id == user_id):
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not enough permissions")
-    updated = update_user(db, user_id, user_in)
+    updated = await crud.update_user(db, user_id, user_in)
     if not updated:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
     return updated
 
 @app.delete("/users/{user_id}", response_model=UserResponse)
-def delete_user_route(
+async def delete_user_route(
     user_id: UUID,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: DbSession = Depends(get_session),
+    current_user: Principal = Depends(get_current_user)
 ):
     # allow self-deletion or admin
     if not (current_user.is_admin or current_user.id == user_id):
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not enough permissions")
-    deleted = delete_user(db, user_id)
+    deleted = await crud.delete_user(db, user_id)
     if not deleted:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
     return deleted
-    deleted = delete_user(db, user_id)
+    deleted = await crud.delete_user(db, user_id)
     if not deleted:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
     return deleted
 
 # Mount routers for grouped CRUD
-from app.routers import artists, events, interests, saved_events
+from app.routers import artists, events, interests, saved_events, admin
 
 app.include_router(artists.router)
 app.include_router(events.router)
 app.include_router(interests.router)
 app.include_router(saved_events.router)
+app.include_router(admin.router)
+
+if profiling.PROFILING_ENABLED:
+    app.add_middleware(profiling.ProfilingMiddleware, authorize=is_admin_request)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, UUID, ForeignKey, TIMESTAMP, func, UniqueConstraint, Boolean
+from sqlalchemy import Column, String, UUID, ForeignKey, TIMESTAMP, func, UniqueConstraint, Boolean, Index, Float
 from sqlalchemy.orm import relationship
 from app.database.database import Base
 import uuid
@@ -16,6 +16,8 @@ class Artist(Base):
     events = relationship("Event", back_populates="artist")
     interests = relationship("Interest", back_populates="artist")
 
+    __table_args__ = (UniqueConstraint("ticketmaster_id", name="unique_artist_ticketmaster_id"),)
+
 
 class Event(Base):
     __tablename__ = "events"
@@ -27,11 +29,26 @@ class Event(Base):
     date = Column(TIMESTAMP, nullable=True)
     location = Column(String(200), nullable=True)
     ticket_url = Column(String, nullable=True)
+    latitude = Column(Float, nullable=True)
+    longitude = Column(Float, nullable=True)
+    # Geohash of the venue, see app.services.geo
+    geo_cell = Column(String(12), nullable=True)
+    content_hash = Column(String(64), nullable=True)
     created_at = Column(TIMESTAMP, nullable=False, default=func.now(), server_default=func.now())
+    # Row version for ETags; bulk upserts set it themselves
+    updated_at = Column(TIMESTAMP, nullable=False, default=func.now(), onupdate=func.now(), server_default=func.now())
 
     artist = relationship("Artist", back_populates="events")
     saved_events = relationship("SavedEvent", back_populates="event")
 
+    __table_args__ = (
+        UniqueConstraint("ticketmaster_id", name="unique_event_ticketmaster_id"),
+        Index("ix_events_artist_id_date", "artist_id", "date"),
+        Index("ix_events_date", "date"),
+        # pattern ops so geo_cell LIKE 'prefix%' is an index range scan under any collation
+        Index("ix_events_geo_cell", "geo_cell", postgresql_ops={"geo_cell": "varchar_pattern_ops"}),
+    )
+
 
 class User(Base):
     __tablename__ = "users"
@@ -60,6 +77,11 @@ class Interest(Base):
     user = relationship("User", back_populates="interests")
     artist = relationship("Artist", back_populates="interests")
 
+    __table_args__ = (
+        UniqueConstraint("user_id", "artist_id", name="unique_interest_user_artist"),
+        Index("ix_interests_artist_id", "artist_id"),
+    )
+
 
 class SavedEvent(Base):
     __tablename__ = "saved_events"
@@ -71,3 +93,8 @@ class SavedEvent(Base):
 
     user = relationship("User", back_populates="saved_events")
     event = relationship("Event", back_populates="saved_events")
+
+    __table_args__ = (
+        UniqueConstraint("user_id", "event_id", name="unique_saved_event_user_event"),
+        Index("ix_saved_events_event_id", "event_id"),
+    )
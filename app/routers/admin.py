@@ -0,0 +1,63 @@
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from typing import Literal, Optional
+
+from app.main import get_current_admin
+from app.database.database import pool_stats
+from app.services.cache import cache_stats
+from app.services.ratelimit import rate_limiter
+from app.services.principal_cache import principal_cache
+from app.services import password_pool, profiling
+from app.services.export import EXPORTS, MEDIA_TYPES, export_query, stream_export
+
+router = APIRouter(
+    prefix="/admin",
+    tags=["admin"],
+    dependencies=[Depends(get_current_admin)],
+)
+
+@router.get("/stats")
+async def read_stats_route():
+    return {
+        "discovery_cache": cache_stats(),
+        "discovery_rate_limit": rate_limiter.stats(),
+        "auth_principal_cache": principal_cache.stats(),
+        "password_pool": password_pool.stats(),
+        "db_pool": pool_stats(),
+    }
+
+@router.get("/db/pool")
+async def read_db_pool_route():
+    return pool_stats()
+
+@router.get("/export/{table}")
+async def export_table_route(table: str, format: Literal["ndjson", "csv"] = "ndjson", cursor: Optional[str] = None):
+    if table not in EXPORTS:
+        raise HTTPException(status_code=404, detail="Unknown export")
+    # built up front so a bad cursor is a 400 rather than a broken stream
+    stmt = export_query(table, cursor)
+    return StreamingResponse(
+        stream_export(table, stmt, format),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{table}.{format}"'},
+    )
+
+@router.get("/profiles")
+async def list_profiles_route():
+    # newest first
+    return [profile.summary() for profile in reversed(profiling.profiles.values())]
+
+@router.get("/profiles/{profile_id}", response_class=PlainTextResponse)
+async def read_profile_route(profile_id: str):
+    profile = profiling.profiles.get(profile_id)
+    if not profile:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    # folded stacks, for flamegraph.pl or speedscope
+    return PlainTextResponse(
+        profile.folded(),
+        headers={"Content-Disposition": f'attachment; filename="profile-{profile.id}.folded"'},
+    )
+
+@router.get("/slow_queries")
+async def list_slow_queries_route():
+    return list(reversed(profiling.slow_queries))
@@ -1,17 +1,10 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
 from uuid import UUID
 
-from app.schemas.schemas import ArtistCreate, ArtistResponse, ArtistUpdate
-from app.database.database_handler import (
-    create_artist,
-    get_artists,
-    get_artist_by_id,
-    update_artist,
-    delete_artist,
-)
-from app.database.database import get_db
-from app.main import get_current_admin
+from app.schemas.schemas import ArtistCreate, ArtistResponse, ArtistUpdate, Page, PageParams
+from app.database import crud
+from app.database.database import DbSession, get_session
+from app.main import get_current_admin, get_page_params
 
 router = APIRouter(
     prefix="/artists",
@@ -20,45 +13,46 @@ router = APIRouter(
 )
 
 @router.post("/", response_model=ArtistResponse, status_code=status.HTTP_201_CREATED)
-def create_artist_route(
+async def create_artist_route(
     artist_in: ArtistCreate,
-    db: Session = Depends(get_db),
+    db: DbSession = Depends(get_session),
 ):
-    return create_artist(db, artist_in)
+    return await crud.create_artist(db, artist_in)
 
-@router.get("/", response_model=list[ArtistResponse])
-def list_artists_route(
-    db: Session = Depends(get_db),
+@router.get("/", response_model=Page[ArtistResponse])
+async def list_artists_route(
+    page: PageParams = Depends(get_page_params),
+    db: DbSession = Depends(get_session),
 ):
-    return get_artists(db)
+    return await crud.get_artists(db, page.limit, page.cursor)
 
 @router.get("/{artist_id}", response_model=ArtistResponse)
-def read_artist_route(
+async def read_artist_route(
     artist_id: UUID,
-    db: Session = Depends(get_db),
+    db: DbSession = Depends(get_session),
 ):
-    artist = get_artist_by_id(db, artist_id)
+    artist = await crud.get_artist_by_id(db, artist_id)
     if not artist:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Artist not found")
     return artist
 
 @router.patch("/{artist_id}", response_model=ArtistResponse)
-def update_artist_route(
+async def update_artist_route(
     artist_id: UUID,
     artist_in: ArtistUpdate,
-    db: Session = Depends(get_db),
+    db: DbSession = Depends(get_session),
 ):
-    updated = update_artist(db, artist_id, artist_in)
+    updated = await crud.update_artist(db, artist_id, artist_in)
     if not updated:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Artist not found")
     return updated
 
 @router.delete("/{artist_id}", response_model=ArtistResponse)
-def delete_artist_route(
+async def delete_artist_route(
     artist_id: UUID,
-    db: Session = Depends(get_db),
+    db: DbSession = Depends(get_session),
 ):
-    deleted = delete_artist(db, artist_id)
+    deleted = await crud.delete_artist(db, artist_id)
     if not deleted:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Artist not found")
     return deleted
@@ -1,66 +1,79 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from uuid import UUID
 
-from app.schemas.schemas import EventCreate, EventResponse, EventUpdate
-from app.database.database_handler import (
-    create_event,
-    get_events,
-    get_event_by_id,
-    update_event,
-    delete_event,
-)
-from app.database.database import get_db
-from app.main import get_current_user, get_current_admin
+from app.schemas.schemas import EventCreate, EventResponse, EventUpdate, NearbyEventResponse, Page, PageParams
+from app.database.pagination import DEFAULT_LIMIT, MAX_LIMIT
+from app.database import crud
+from app.database.database import DbSession, get_session
+from app.main import get_current_user, get_current_admin, get_page_params
+from app.services.http_cache import conditional_response, make_etag
 
 router = APIRouter(
     prefix="/events",
     tags=["events"],
 )
 
-@router.get("/", response_model=list[EventResponse], dependencies=[Depends(get_current_user)])
-def list_events_route(
-    db: Session = Depends(get_db),
+@router.get("/", response_model=Page[EventResponse], dependencies=[Depends(get_current_user)])
+async def list_events_route(
+    page: PageParams = Depends(get_page_params),
+    db: DbSession = Depends(get_session),
+):
+    return await crud.get_events(db, page.limit, page.cursor)
+
+@router.get("/nearby", response_model=list[NearbyEventResponse], dependencies=[Depends(get_current_user)])
+async def list_nearby_events_route(
+    lat: float = Query(..., ge=-90, le=90),
+    lon: float = Query(..., ge=-180, le=180),
+    radius_km: float = Query(25, gt=0, le=500),
+    limit: int = Query(DEFAULT_LIMIT, ge=1, le=MAX_LIMIT),
+    db: DbSession = Depends(get_session),
 ):
-    return get_events(db)
+    # Upcoming events nearest first
+    nearby = await crud.get_events_near(db, lat, lon, radius_km, limit)
+    return [
+        NearbyEventResponse(**EventResponse.model_validate(event).model_dump(), distance_km=round(distance, 3))
+        for event, distance in nearby
+    ]
 
 @router.get("/{event_id}", response_model=EventResponse, dependencies=[Depends(get_current_user)])
-def read_event_route(
+async def read_event_route(
     event_id: UUID,
-    db: Session = Depends(get_db),
+    request: Request,
+    response: Response,
+    db: DbSession = Depends(get_session),
 ):
-    event = get_event_by_id(db, event_id)
+    event = await crud.get_event_by_id(db, event_id)
     if not event:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Event not found")
-    return event
+    return conditional_response(request, response, make_etag(event.id, event.updated_at)) or event
 
 @router.post("/", response_model=EventResponse, status_code=status.HTTP_201_CREATED,
              dependencies=[Depends(get_current_admin)])
-def create_event_route(
+async def create_event_route(
     event_in: EventCreate,
-    db: Session = Depends(get_db),
+    db: DbSession = Depends(get_session),
 ):
-    return create_event(db, event_in)
+    return await crud.create_event(db, event_in)
 
 @router.patch("/{event_id}", response_model=EventResponse,
             dependencies=[Depends(get_current_admin)])
-def update_event_route(
+async def update_event_route(
     event_id: UUID,
     event_in: EventUpdate,
-    db: Session = Depends(get_db),
+    db: DbSession = Depends(get_session),
 ):
-    updated = update_event(db, event_id, event_in)
+    updated = await crud.update_event(db, event_id, event_in)
     if not updated:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Event not found")
     return updated
 
 @router.delete("/{event_id}", response_model=EventResponse,
                dependencies=[Depends(get_current_admin)])
-def delete_event_route(
+async def delete_event_route(
     event_id: UUID,
-    db: Session = Depends(get_db),
+    db: DbSession = Depends(get_session),
 ):
-    deleted = delete_event(db, event_id)
+    deleted = await crud.delete_event(db, event_id)
     if not deleted:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Event not found")
     return deleted
@@ -1,7 +1,19 @@
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, EmailStr, Field
 from uuid import UUID
 from datetime import datetime
-from typing import Optional
+from typing import Generic, Literal, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+# Pagination Schemas
+class PageParams(BaseModel):
+    limit: int
+    cursor: Optional[str] = None
+
+class Page(BaseModel, Generic[T]):
+    items: list[T]
+    next_cursor: Optional[str] = None
 
 
 # User Schemas
@@ -35,6 +47,10 @@ class UserResponse(UserBase):
     class Config:
         from_attributes = True
 
+class Principal(UserResponse):
+    # the authenticated user as cached by get_current_user, detached from any session
+    is_admin: bool = False
+
 
 # Artist Schemas
 class ArtistBase(BaseModel):
@@ -55,6 +71,19 @@ class ArtistResponse(ArtistBase):
     class Config:
         from_attributes = True
 
+# Onboarding imports up to this many artists per request
+MAX_BATCH_FOLLOW = 200
+
+class FollowArtistsRequest(BaseModel):
+    names: list[str] = Field(default_factory=list, max_length=MAX_BATCH_FOLLOW)
+    ticketmaster_ids: list[str] = Field(default_factory=list, max_length=MAX_BATCH_FOLLOW)
+
+class FollowArtistResult(BaseModel):
+    # the name or Ticketmaster id as sent
+    query: str
+    status: Literal["followed", "already_following", "not_found", "failed"]
+    artist: Optional[ArtistResponse] = None
+
 
 # Event Schemas
 class EventBase(BaseModel):
@@ -77,11 +106,30 @@ class EventUpdate(BaseModel):
 class EventResponse(EventBase):
     id: UUID
     artist_id: UUID
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
     created_at: Optional[datetime]
 
     class Config:
         from_attributes = True
 
+class NearbyEventResponse(EventResponse):
+    distance_km: float
+
+class EventDetail(EventResponse):
+    artist: Optional[ArtistResponse] = None
+
+
+class SyncReport(BaseModel):
+    inserted: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    removed: int = 0
+
+class SyncResult(BaseModel):
+    events: list[EventResponse]
+    report: SyncReport
+
 
 # Interest Schemas
 class InterestBase(BaseModel):
@@ -121,3 +169,6 @@ class SavedEventResponse(SavedEventBase):
 
     class Config:
         from_attributes = True
+
+class SavedEventDetail(SavedEventResponse):
+    event: EventDetail
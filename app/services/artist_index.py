@@ -0,0 +1,155 @@
+"""In-memory prefix and trigram index over stored artist names for autocomplete.
+
+Loaded from the artists table at startup and kept current by the artist
+handlers of this process. Artists stored by other workers show up after
+their restart; until then autocomplete falls back to Ticketmaster for them.
+"""
+import bisect
+import threading
+import unicodedata
+from typing import Optional
+from uuid import UUID
+
+# Minimum trigram similarity (Jaccard) for a fuzzy match
+TRIGRAM_THRESHOLD = 0.3
+
+
+def normalize(name: str) -> str:
+    # fold case and accents so "beyonce" finds "Beyoncé"
+    decomposed = unicodedata.normalize("NFKD", name.casefold())
+    return " ".join("".join(ch for ch in decomposed if not unicodedata.combining(ch)).split())
+
+
+def trigrams(text: str) -> set[str]:
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class ArtistIndex:
+    def __init__(self):
+        self._artists: dict[UUID, tuple[str, Optional[str]]] = {}
+        # (word prefix key, artist id), sorted so a prefix is one bisect away
+        self._keys: list[tuple[str, UUID]] = []
+        self._trigrams: dict[str, set[UUID]] = {}
+        self._trigram_counts: dict[UUID, int] = {}
+        # sync handlers update it from threadpool workers
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._artists)
+
+    @staticmethod
+    def _key_words(normalized: str) -> list[str]:
+        # the full name and every suffix starting at a word, so both "the beat" and "beat" find "The Beatles"
+        words = normalized.split(" ")
+        return [" ".join(words[i:]) for i in range(len(words))]
+
+    def _remove(self, artist_id: UUID) -> None:
+        entry = self._artists.pop(artist_id, None)
+        if entry is None:
+            return
+        normalized = normalize(entry[0])
+        for key in self._key_words(normalized):
+            i = bisect.bisect_left(self._keys, (key, artist_id))
+            if i < len(self._keys) and self._keys[i] == (key, artist_id):
+                del self._keys[i]
+        for gram in trigrams(normalized):
+            ids = self._trigrams.get(gram)
+            if ids is not None:
+                ids.discard(artist_id)
+                if not ids:
+                    del self._trigrams[gram]
+        self._trigram_counts.pop(artist_id, None)
+
+    def add(self, artist_id: UUID, name: str, ticketmaster_id: Optional[str]) -> None:
+        """Index an artist, replacing its previous name if it was already indexed."""
+        normalized = normalize(name)
+        grams = trigrams(normalized)
+        with self._lock:
+            self._remove(artist_id)
+            self._artists[artist_id] = (name, ticketmaster_id)
+            for key in self._key_words(normalized):
+                bisect.insort(self._keys, (key, artist_id))
+            for gram in grams:
+                self._trigrams.setdefault(gram, set()).add(artist_id)
+            self._trigram_counts[artist_id] = len(grams)
+
+    def remove(self, artist_id: UUID) -> None:
+        with self._lock:
+            self._remove(artist_id)
+
+    def load(self, artists) -> None:
+        """Replace the index with (id, name, ticketmaster_id) rows.
+
+        Built aside and sorted once, then swapped in, so searches never see a
+        partial index.
+        """
+        loaded = {artist_id: (name, ticketmaster_id) for artist_id, name, ticketmaster_id in artists}
+        keys = []
+        trigram_index: dict[str, set[UUID]] = {}
+        trigram_counts = {}
+        for artist_id, (name, _) in loaded.items():
+            normalized = normalize(name)
+            keys.extend((key, artist_id) for key in self._key_words(normalized))
+            grams = trigrams(normalized)
+            for gram in grams:
+                trigram_index.setdefault(gram, set()).add(artist_id)
+            trigram_counts[artist_id] = len(grams)
+        keys.sort()
+        with self._lock:
+            self._artists, self._keys = loaded, keys
+            self._trigrams, self._trigram_counts = trigram_index, trigram_counts
+
+    def lookup(self, name: str) -> Optional[dict]:
+        """The indexed Ticketmaster artist named exactly name, ignoring case and accents."""
+        normalized = normalize(name)
+        with self._lock:
+            i = bisect.bisect_left(self._keys, (normalized,))
+            while i < len(self._keys) and self._keys[i][0] == normalized:
+                display_name, ticketmaster_id = self._artists[self._keys[i][1]]
+                # the key may be a trailing part of a longer name
+                if ticketmaster_id and normalize(display_name) == normalized:
+                    return {"id": ticketmaster_id, "name": display_name}
+                i += 1
+        return None
+
+    def search(self, query: str, limit: int = 10) -> list[dict]:
+        """Artists with a word of their name starting with query, else fuzzy trigram matches.
+
+        Results have the shape of discovery search results.
+        """
+        normalized = normalize(query)
+        if not normalized:
+            return []
+        with self._lock:
+            found: dict[UUID, None] = {}
+            i = bisect.bisect_left(self._keys, (normalized,))
+            while i < len(self._keys) and len(found) < limit:
+                key, artist_id = self._keys[i]
+                if not key.startswith(normalized):
+                    break
+                found[artist_id] = None
+                i += 1
+
+            # fuzzy matching is for typos, it costs a scan of every artist sharing a trigram
+            if not found:
+                grams = trigrams(normalized)
+                shared: dict[UUID, int] = {}
+                for gram in grams:
+                    for artist_id in self._trigrams.get(gram, ()):
+                        shared[artist_id] = shared.get(artist_id, 0) + 1
+                scored = []
+                for artist_id, count in shared.items():
+                    similarity = count / (len(grams) + self._trigram_counts[artist_id] - count)
+                    if similarity >= TRIGRAM_THRESHOLD:
+                        scored.append((-similarity, self._artists[artist_id][0], artist_id))
+                for _, _, artist_id in sorted(scored)[:limit]:
+                    found[artist_id] = None
+
+            return [
+                {"id": self._artists[artist_id][1], "name": self._artists[artist_id][0]}
+                for artist_id in found
+            ]
+
+
+artist_index = ArtistIndex()
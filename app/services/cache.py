@@ -0,0 +1,187 @@
+"""Read-through caching for Ticketmaster Discovery API lookups.
+
+Entries live in a pluggable backend: an in-process LRU by default, or any
+shared key-value store whose client offers get(key) and
+set(key, value, ex=seconds), e.g. redis.Redis / redis.asyncio.Redis or
+LocalKeyValueStore, a dict-backed stand-in for local runs and tests.
+"""
+import inspect
+import json
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Optional
+
+CACHE_BACKEND = os.getenv("DISCOVERY_CACHE_BACKEND", "memory")
+CACHE_URL = os.getenv("DISCOVERY_CACHE_URL")
+CACHE_MAX_ENTRIES = int(os.getenv("DISCOVERY_CACHE_MAX_ENTRIES", "10000"))
+SEARCH_CACHE_TTL = float(os.getenv("SEARCH_CACHE_TTL_SECONDS", "300"))
+EVENTS_CACHE_TTL = float(os.getenv("EVENTS_CACHE_TTL_SECONDS", "900"))
+# Empty results are cached too, but for less time
+NEGATIVE_CACHE_TTL = float(os.getenv("NEGATIVE_CACHE_TTL_SECONDS", "60"))
+
+_MISSING = object()
+
+
+class InProcessBackend:
+    """Bounded LRU with a TTL per entry, local to this worker."""
+
+    def __init__(self, max_entries: int = CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+
+    async def get(self, key: str):
+        entry = self._entries.get(key)
+        if entry is None:
+            return _MISSING
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return _MISSING
+        self._entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value, ttl: float) -> None:
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class LocalKeyValueStore:
+    """The get/set subset of a Redis client, in a dict of strings with expiry times."""
+
+    def __init__(self):
+        self._values: dict[str, tuple[float, str]] = {}
+
+    def get(self, key: str) -> Optional[str]:
+        entry = self._values.get(key)
+        if entry is None or entry[0] <= time.monotonic():
+            self._values.pop(key, None)
+            return None
+        return entry[1]
+
+    def set(self, key: str, value: str, ex: int) -> None:
+        self._values[key] = (time.monotonic() + ex, value)
+
+
+class KeyValueBackend:
+    """Shared store for several workers; values are stored as JSON and expired by the store."""
+
+    def __init__(self, client, prefix: str = "eventsphere:"):
+        self.client = client
+        self.prefix = prefix
+
+    async def get(self, key: str):
+        raw = self.client.get(self.prefix + key)
+        if inspect.isawaitable(raw):
+            raw = await raw
+        if raw is None:
+            return _MISSING
+        return json.loads(raw)
+
+    async def set(self, key: str, value, ttl: float) -> None:
+        result = self.client.set(self.prefix + key, json.dumps(value), ex=max(1, int(ttl)))
+        if inspect.isawaitable(result):
+            await result
+
+
+def backend_from_env():
+    if CACHE_BACKEND == "memory":
+        return InProcessBackend()
+    if CACHE_BACKEND == "redis":
+        try:
+            import redis.asyncio as redis
+        except ImportError as exc:
+            raise RuntimeError("DISCOVERY_CACHE_BACKEND=redis requires the redis package") from exc
+        return KeyValueBackend(redis.from_url(CACHE_URL))
+    if CACHE_BACKEND == "local":
+        # the shared backend's code path, JSON round trip included, without a server
+        return KeyValueBackend(LocalKeyValueStore())
+    raise RuntimeError(f"Unknown DISCOVERY_CACHE_BACKEND: {CACHE_BACKEND}")
+
+
+_backend = None
+
+
+def get_backend():
+    global _backend
+    if _backend is None:
+        _backend = backend_from_env()
+    return _backend
+
+
+def configure_backend(backend) -> None:
+    """Swap the backend shared by all caches, e.g. for a local key-value stand-in."""
+    global _backend
+    _backend = backend
+
+
+def normalize_key(value: str) -> str:
+    # "  Daft   PUNK " and "daft punk" share an entry
+    return " ".join(value.casefold().split())
+
+
+class TTLCache:
+    """Read-through cache for one kind of lookup, with hit and miss counters.
+
+    normalize_keys folds case and whitespace, for free-text queries only:
+    Ticketmaster ids are case-sensitive.
+    """
+
+    def __init__(
+        self, name: str, ttl: float, negative_ttl: float = NEGATIVE_CACHE_TTL, normalize_keys: bool = False
+    ):
+        self.name = name
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.normalize_keys = normalize_keys
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+
+    async def get_or_load(self, key: str, loader: Callable[[], Awaitable[Optional[list]]]):
+        """Return the cached value for key or call loader and cache what it returns.
+
+        None means the lookup failed and is never cached; an empty result is
+        cached for negative_ttl.
+        """
+        cache_key = f"{self.name}:{normalize_key(key) if self.normalize_keys else key}"
+        backend = get_backend()
+        value = await backend.get(cache_key)
+        if value is not _MISSING:
+            self.hits += 1
+            if not value:
+                self.negative_hits += 1
+            return value
+
+        self.misses += 1
+        value = await loader()
+        if value is not None:
+            await backend.set(cache_key, value, self.ttl if value else self.negative_ttl)
+        return value
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "negative_hits": self.negative_hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+search_cache = TTLCache("search", SEARCH_CACHE_TTL, normalize_keys=True)
+events_cache = TTLCache("events", EVENTS_CACHE_TTL)
+attraction_cache = TTLCache("attraction", SEARCH_CACHE_TTL)
+
+
+def cache_stats() -> dict:
+    stats = {cache.name: cache.stats() for cache in (search_cache, events_cache, attraction_cache)}
+    backend = get_backend()
+    if isinstance(backend, InProcessBackend):
+        stats["entries"] = len(backend)
+    return stats
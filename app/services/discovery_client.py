@@ -0,0 +1,221 @@
+import asyncio
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import AsyncIterator, Iterator, Optional
+
+import httpx
+
+from app.services import discoveryapi, metrics
+from app.services.cache import search_cache, events_cache, attraction_cache
+from app.services.ratelimit import rate_limiter, parse_retry_after, QuotaExhausted
+from app.services.discoveryapi import (
+    clean_artist, clean_event, events_page_params, is_event_feed_truncated, total_event_pages,
+)
+
+# Shared connection pool settings for the Ticketmaster client
+MAX_CONNECTIONS = int(os.getenv("TICKETMASTER_MAX_CONNECTIONS", "20"))
+MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("TICKETMASTER_MAX_KEEPALIVE", "10"))
+KEEPALIVE_EXPIRY = float(os.getenv("TICKETMASTER_KEEPALIVE_EXPIRY", "30"))
+# How many event pages of one artist may be in flight at once
+PAGE_CONCURRENCY = int(os.getenv("TICKETMASTER_PAGE_CONCURRENCY", "4"))
+# Retries of a request answered with 429, after waiting out its Retry-After
+MAX_THROTTLE_RETRIES = int(os.getenv("TICKETMASTER_MAX_THROTTLE_RETRIES", "2"))
+
+_client: Optional[httpx.AsyncClient] = None
+
+
+# Set by count_requests() so callers can see how many upstream calls a unit of work made
+_request_counter: ContextVar[Optional[list]] = ContextVar("discovery_request_counter", default=None)
+
+
+class DiscoveryAPIError(Exception):
+    """Raised when a Ticketmaster request fails part-way through a paginated fetch."""
+
+
+class DiscoveryUnavailable(DiscoveryAPIError):
+    """Raised when Ticketmaster can't be asked now: the daily budget is spent or it keeps answering 429."""
+
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def _build_client() -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        timeout=httpx.Timeout(discoveryapi.REQUEST_TIMEOUT),
+        limits=httpx.Limits(
+            max_connections=MAX_CONNECTIONS,
+            max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=KEEPALIVE_EXPIRY,
+        ),
+    )
+
+
+async def start_client() -> httpx.AsyncClient:
+    """Open the shared keep-alive client. Called on application startup."""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = _build_client()
+    return _client
+
+
+async def close_client() -> None:
+    """Close the shared client and its pooled connections. Called on shutdown."""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+def get_client() -> httpx.AsyncClient:
+    """Return the shared client, creating it lazily outside the app lifespan."""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = _build_client()
+    return _client
+
+
+async def _get(path: str, params: dict) -> Optional[dict]:
+    params = {"apikey": discoveryapi.TICKETMASTER_API_KEY, **params}
+    return await _get_raw(path, params)
+
+
+@contextmanager
+def count_requests() -> Iterator[list]:
+    """Count upstream requests made inside the block, including by tasks it spawns.
+
+    Yields a one-element list whose value is the running count.
+    """
+    counter = [0]
+    token = _request_counter.set(counter)
+    try:
+        yield counter
+    finally:
+        _request_counter.reset(token)
+
+
+async def _get_raw(path: str, params: dict) -> Optional[dict]:
+    """The JSON of a 200 response, None on other failures; raises DiscoveryUnavailable when throttled."""
+    for attempt in range(MAX_THROTTLE_RETRIES + 1):
+        try:
+            await rate_limiter.acquire()
+        except QuotaExhausted as exc:
+            raise DiscoveryUnavailable(str(exc), rate_limiter.budget.seconds_until_reset()) from exc
+        counter = _request_counter.get()
+        if counter is not None:
+            counter[0] += 1
+        started = time.perf_counter()
+        try:
+            response = await get_client().get(f"{discoveryapi.BASE_URL}{path}", params=params)
+        except httpx.HTTPError:
+            metrics.observe_upstream(path, "error", time.perf_counter() - started)
+            return None
+        metrics.observe_upstream(path, response.status_code, time.perf_counter() - started)
+        rate_limiter.observe(response.headers)
+        if response.status_code == 429:
+            retry_after = parse_retry_after(response.headers.get("Retry-After"))
+            rate_limiter.pause(retry_after)
+            if attempt < MAX_THROTTLE_RETRIES:
+                continue
+            raise DiscoveryUnavailable(f"Ticketmaster is still throttling {path}", retry_after)
+        if response.status_code != 200:
+            return None
+        return response.json()
+
+
+async def search_artist(artist_name: str):
+    """Cleaned attractions matching a keyword, cached by keyword; None if the lookup failed."""
+    return await search_cache.get_or_load(artist_name, lambda: _search_artist(artist_name))
+
+
+async def _search_artist(artist_name: str):
+    data = await _get("/attractions.json", {"keyword": artist_name})
+    if data is None:
+        return None
+    raw_artists = data.get("_embedded", {}).get("attractions", [])
+    return [clean_artist(artist) for artist in raw_artists]
+
+
+async def get_attraction(ticketmaster_id: str):
+    """Look up one attraction by its Ticketmaster id: [artist], [] if unknown, None on failure."""
+    return await attraction_cache.get_or_load(ticketmaster_id, lambda: _get_attraction(ticketmaster_id))
+
+
+async def _get_attraction(ticketmaster_id: str):
+    # the search endpoint answers an unknown id with an empty list rather than a 404
+    data = await _get("/attractions.json", {"id": ticketmaster_id})
+    if data is None:
+        return None
+    raw_artists = data.get("_embedded", {}).get("attractions", [])
+    return [clean_artist(artist) for artist in raw_artists]
+
+
+async def _fetch_events_page(artist_id: str, page: int) -> dict:
+    data = await _get_raw("/events.json", events_page_params(artist_id, page))
+    if data is None:
+        raise DiscoveryAPIError(f"Failed to fetch events page {page} for attraction {artist_id}")
+    return data
+
+
+def _clean_events_page(data: dict) -> list[dict]:
+    raw_events = data.get("_embedded", {}).get("events", [])
+    return [clean_event(event) for event in raw_events]
+
+
+async def _iter_numbered_event_pages(artist_id: str) -> AsyncIterator[tuple[int, list[dict], bool]]:
+    first = await _fetch_events_page(artist_id, 0)
+    truncated = is_event_feed_truncated(first)
+    yield 0, _clean_events_page(first), truncated
+
+    total_pages = total_event_pages(first)
+    if total_pages <= 1:
+        return
+
+    # Fetch the remaining pages concurrently, bounded by PAGE_CONCURRENCY
+    semaphore = asyncio.Semaphore(PAGE_CONCURRENCY)
+
+    async def fetch(page: int) -> tuple[int, list[dict], bool]:
+        async with semaphore:
+            return page, _clean_events_page(await _fetch_events_page(artist_id, page)), truncated
+
+    tasks = [asyncio.create_task(fetch(page)) for page in range(1, total_pages)]
+    try:
+        for next_page in asyncio.as_completed(tasks):
+            yield await next_page
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+async def iter_upcoming_event_pages(artist_id: str) -> AsyncIterator[tuple[list[dict], bool]]:
+    """Yield cleaned events one page at a time, in the order the pages arrive.
+
+    Each page comes with whether the feed is truncated: Ticketmaster won't
+    page past the 1000th event, so the latest events of larger feeds are
+    never seen. Raises DiscoveryAPIError if any page fails, so callers never
+    mistake a partial feed for a complete one.
+    """
+    async for _, events, truncated in _iter_numbered_event_pages(artist_id):
+        yield events, truncated
+
+
+async def get_upcoming_events(artist_id: str):
+    """Cleaned upcoming events of an attraction across all pages, cached by attraction; None on failure.
+
+    Syncs use iter_upcoming_event_pages instead, which always goes upstream.
+    """
+    return await events_cache.get_or_load(artist_id, lambda: _get_upcoming_events(artist_id))
+
+
+async def _get_upcoming_events(artist_id: str):
+    pages = {}
+    try:
+        async for page, events, _ in _iter_numbered_event_pages(artist_id):
+            pages[page] = events
+    except DiscoveryUnavailable:
+        raise
+    except DiscoveryAPIError:
+        return None
+    return [event for page in sorted(pages) for event in pages[page]]
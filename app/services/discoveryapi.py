@@ -1,4 +1,3 @@
-import requests
 import os
 from dotenv import load_dotenv
 
@@ -6,63 +5,69 @@ load_dotenv()
 TICKETMASTER_API_KEY = os.getenv("TICKETMASTER_API_KEY")
 
 BASE_URL = "https://app.ticketmaster.com/discovery/v2"
+REQUEST_TIMEOUT = float(os.getenv("TICKETMASTER_TIMEOUT", "10"))
 
+# Discovery API allows at most 200 results per page and refuses to page past the 1000th item
+EVENTS_PAGE_SIZE = 200
+MAX_EVENT_PAGES = 1000 // EVENTS_PAGE_SIZE
 
-def search_artist(artist_name: str):
-    """Fetch and clean artist info from Ticketmaster Discovery API."""
-    url = f"{BASE_URL}/attractions.json"
-    params = {
-        "apikey": TICKETMASTER_API_KEY,
-        "keyword": artist_name
+
+def clean_artist(artist: dict) -> dict:
+    """Reduce a raw Discovery API attraction to the fields we store."""
+    return {
+        "id": artist.get("id"),
+        "name": artist.get("name")
     }
-    response = requests.get(url, params=params)
-    if response.status_code != 200:
-        return None
 
-    data = response.json()
-    raw_artists = data.get("_embedded", {}).get("attractions", [])
 
-    cleaned_artists = []
-    for artist in raw_artists:
-        cleaned_artists.append({
-            "id": artist.get("id"),
-            "name": artist.get("name")
-        })
+def clean_event(event: dict) -> dict:
+    """Reduce a raw Discovery API event to the fields we store."""
+    cleaned_event = {
+        "id": event.get("id"),
+        "name": event.get("name"),
+        "date": event.get("dates", {}).get("start", {}).get("dateTime"),
+        "ticket_url": event.get("url"),
+    }
 
-    return cleaned_artists
+    # Build location string
+    venue = event.get("_embedded", {}).get("venues", [{}])[0]
+    city = venue.get("city", {}).get("name", "")
+    country = venue.get("country", {}).get("name", "")
+    venue_name = venue.get("name", "")
+    location = f"{venue_name}, {city}, {country}".strip(", ")
 
+    cleaned_event["location"] = location
+    coordinates = venue.get("location", {})
+    cleaned_event["latitude"] = parse_coordinate(coordinates.get("latitude"))
+    cleaned_event["longitude"] = parse_coordinate(coordinates.get("longitude"))
+    return cleaned_event
+
+
+def parse_coordinate(value):
+    # Discovery sends coordinates as strings
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
 
-def get_upcoming_events(artist_id: str):
-    """Fetch and clean upcoming events for an artist from Ticketmaster."""
-    url = f"{BASE_URL}/events.json"
-    params = {
+
+def events_page_params(artist_id: str, page: int) -> dict:
+    return {
         "apikey": TICKETMASTER_API_KEY,
-        "attractionId": artist_id
+        "attractionId": artist_id,
+        "size": EVENTS_PAGE_SIZE,
+        "page": page,
+        "sort": "date,asc",
     }
-    response = requests.get(url, params=params)
-    if response.status_code != 200:
-        return None
 
-    data = response.json()
-    raw_events = data.get("_embedded", {}).get("events", [])
-
-    cleaned_events = []
-    for event in raw_events:
-        cleaned_event = {
-            "id": event.get("id"),
-            "name": event.get("name"),
-            "date": event.get("dates", {}).get("start", {}).get("dateTime"),
-            "ticket_url": event.get("url"),
-        }
-
-        # Build location string
-        venue = event.get("_embedded", {}).get("venues", [{}])[0]
-        city = venue.get("city", {}).get("name", "")
-        country = venue.get("country", {}).get("name", "")
-        venue_name = venue.get("name", "")
-        location = f"{venue_name}, {city}, {country}".strip(", ")
-
-        cleaned_event["location"] = location
-        cleaned_events.append(cleaned_event)
-
-    return cleaned_events
\ No newline at end of file
+
+def total_event_pages(data: dict) -> int:
+    """Number of pages we can fetch for an events response, capped by the deep paging limit."""
+    total_pages = data.get("page", {}).get("totalPages", 1)
+    return max(1, min(total_pages, MAX_EVENT_PAGES))
+
+
+def is_event_feed_truncated(data: dict) -> bool:
+    """Whether the deep paging limit hides the latest events of an events response."""
+    return data.get("page", {}).get("totalPages", 1) > MAX_EVENT_PAGES
+
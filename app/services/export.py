@@ -0,0 +1,110 @@
+"""Streaming NDJSON and CSV exports of whole tables for admins.
+
+Rows are read through a server-side cursor in batches of EXPORT_BATCH_SIZE
+and written to the response as each batch arrives, so memory stays flat
+however large the table. Every row carries the cursor of its position: a
+client whose download broke off passes the last one it received to
+continue after that row.
+"""
+import csv
+import io
+import json
+import os
+from datetime import datetime
+from typing import Iterator, Optional
+from uuid import UUID
+
+from sqlalchemy import select
+
+from app.database.database import SessionLocal
+from app.database.pagination import encode_cursor, keyset_after
+from app.models.models import Artist, Event, User
+
+# Rows fetched from the database cursor per round trip and written per chunk
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "1000"))
+
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+# Exported columns of each table, and the keyset order of the table's list endpoint
+EXPORTS = {
+    "users": (
+        [User.id, User.name, User.email, User.location, User.is_admin, User.created_at],
+        User.created_at,
+        User.id,
+    ),
+    "artists": (
+        [Artist.id, Artist.name, Artist.ticketmaster_id, Artist.created_at, Artist.last_synced_at],
+        Artist.created_at,
+        Artist.id,
+    ),
+    "events": (
+        [
+            Event.id, Event.ticketmaster_id, Event.artist_id, Event.name, Event.date, Event.location,
+            Event.ticket_url, Event.latitude, Event.longitude, Event.created_at, Event.updated_at,
+        ],
+        Event.date,
+        Event.id,
+    ),
+}
+
+
+def export_query(table: str, cursor: Optional[str] = None):
+    """The rows of table after cursor; raises InvalidCursor before anything is streamed."""
+    columns, sort_column, id_column = EXPORTS[table]
+    return keyset_after(select(*columns), sort_column, id_column, cursor)
+
+
+def _json_value(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, UUID):
+        return str(value)
+    raise TypeError(f"Cannot export {type(value).__name__}")
+
+
+def _ndjson_chunk(rows, keys: list[str], sort_key: str) -> str:
+    lines = []
+    for row in rows:
+        item = dict(zip(keys, row))
+        item["cursor"] = encode_cursor(item[sort_key], item["id"])
+        lines.append(json.dumps(item, default=_json_value))
+    return "\n".join(lines) + "\n"
+
+
+def _csv_chunk(rows, keys: list[str], sort_key: str) -> str:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        item = dict(zip(keys, row))
+        values = [value.isoformat() if isinstance(value, datetime) else value for value in row]
+        writer.writerow(values + [encode_cursor(item[sort_key], item["id"])])
+    return buffer.getvalue()
+
+
+def _csv_header(keys: list[str]) -> str:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerow(keys + ["cursor"])
+    return buffer.getvalue()
+
+
+def stream_export(table: str, stmt, format: str) -> Iterator[str]:
+    """Yield the export of stmt chunk by chunk.
+
+    Runs with its own session: the response is streamed after the request's
+    session has been closed. Starlette iterates it on the threadpool.
+    """
+    columns, sort_column, _ = EXPORTS[table]
+    keys = [column.key for column in columns]
+    if format == "csv":
+        write_chunk = _csv_chunk
+        yield _csv_header(keys)
+    else:
+        write_chunk = _ndjson_chunk
+    db = SessionLocal()
+    try:
+        # yield_per streams from a server-side cursor instead of buffering the whole result
+        result = db.execute(stmt.execution_options(yield_per=EXPORT_BATCH_SIZE))
+        for rows in result.partitions():
+            yield write_chunk(rows, keys, sort_column.key)
+    finally:
+        db.close()
@@ -0,0 +1,56 @@
+"""Resolving the artist names and Ticketmaster ids of a batch follow.
+
+Ids already stored are found with one query and names with the in-memory
+artist index. Only the rest go to Ticketmaster, concurrently but at most
+FOLLOW_RESOLVE_CONCURRENCY at a time, through the usual cache and rate limiter.
+A lookup Ticketmaster fails is reported as failed without failing the batch.
+"""
+import asyncio
+import os
+from typing import Optional
+
+from app.database import crud
+from app.database.database import DbSession
+from app.services.artist_index import artist_index
+from app.services.discovery_client import DiscoveryAPIError, get_attraction, search_artist
+
+FOLLOW_RESOLVE_CONCURRENCY = int(os.getenv("FOLLOW_RESOLVE_CONCURRENCY", "8"))
+
+
+async def resolve_artists(
+    db: DbSession, names: list[str], ticketmaster_ids: list[str]
+) -> list[tuple[str, Optional[dict], str]]:
+    """Resolve names, then ids, in request order to (query, artist data or None, status if unresolved)."""
+    stored = {
+        artist.ticketmaster_id: {"id": artist.ticketmaster_id, "name": artist.name}
+        for artist in await crud.get_artists_by_ticketmaster_ids(db, list(set(ticketmaster_ids)))
+    } if ticketmaster_ids else {}
+    semaphore = asyncio.Semaphore(FOLLOW_RESOLVE_CONCURRENCY)
+
+    async def upstream(lookup, query: str) -> tuple[Optional[dict], str]:
+        async with semaphore:
+            try:
+                found = await lookup(query)
+            except DiscoveryAPIError:
+                # e.g. out of quota: report it and still follow what the other lookups resolved
+                found = None
+        if found is None:
+            return None, "failed"
+        if not found:
+            return None, "not_found"
+        # like follow_artist_route, a name follows Ticketmaster's best match
+        return found[0], ""
+
+    async def resolve_name(name: str) -> tuple[Optional[dict], str]:
+        local = artist_index.lookup(name)
+        return (local, "") if local else await upstream(search_artist, name)
+
+    async def resolve_id(ticketmaster_id: str) -> tuple[Optional[dict], str]:
+        local = stored.get(ticketmaster_id)
+        return (local, "") if local else await upstream(get_attraction, ticketmaster_id)
+
+    resolved = await asyncio.gather(
+        *(resolve_name(name) for name in names),
+        *(resolve_id(ticketmaster_id) for ticketmaster_id in ticketmaster_ids),
+    )
+    return [(query, data, status) for query, (data, status) in zip([*names, *ticketmaster_ids], resolved)]
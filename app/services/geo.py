@@ -0,0 +1,107 @@
+"""Geohash cells and great-circle distances for nearby event search.
+
+Events store the geohash of their venue. A geohash prefix is a rectangular
+cell and every point inside it has a hash starting with it, so the events
+within radius_km of a point are all in the 3x3 block of cells around it,
+at a precision whose cells are at least radius_km wide and tall. That
+block is a handful of index range scans, narrowed further by the circle's
+latitude/longitude bounding box; exact distances are computed on what
+remains.
+"""
+import math
+
+_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+# Precision stored on events, cells of about 150 m
+GEO_CELL_PRECISION = 7
+EARTH_RADIUS_KM = 6371.0
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+
+
+def encode(latitude: float, longitude: float, precision: int = GEO_CELL_PRECISION) -> str:
+    lat_range, lon_range = [-90.0, 90.0], [-180.0, 180.0]
+    cell, bits, bit_count, even = [], 0, 0, True
+    while len(cell) < precision:
+        # bits alternate between longitude and latitude, starting with longitude
+        value, bounds = (longitude, lon_range) if even else (latitude, lat_range)
+        mid = (bounds[0] + bounds[1]) / 2
+        bits <<= 1
+        if value >= mid:
+            bits |= 1
+            bounds[0] = mid
+        else:
+            bounds[1] = mid
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            cell.append(_BASE32[bits])
+            bits, bit_count = 0, 0
+    return "".join(cell)
+
+
+def cell_size(precision: int) -> tuple[float, float]:
+    """Height and width in degrees of the cells at a precision."""
+    bits = 5 * precision
+    return 180.0 / 2 ** (bits // 2), 360.0 / 2 ** ((bits + 1) // 2)
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    d_phi = phi2 - phi1
+    d_lambda = math.radians(lon2 - lon1)
+    a = math.sin(d_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def covering_cells(latitude: float, longitude: float, radius_km: float) -> list[str]:
+    """Geohash prefixes whose cells together contain every point within radius_km.
+
+    Returns [""] (no pruning) when the circle is too large for any cell.
+    """
+    # cells get narrower towards the poles, size them for the circle's most polar latitude
+    farthest_lat = min(90.0, abs(latitude) + radius_km / KM_PER_DEGREE)
+    km_per_lon_degree = KM_PER_DEGREE * math.cos(math.radians(farthest_lat))
+    precision = GEO_CELL_PRECISION
+    while precision > 0:
+        height, width = cell_size(precision)
+        if height * KM_PER_DEGREE >= radius_km and width * km_per_lon_degree >= radius_km:
+            break
+        precision -= 1
+    if precision == 0:
+        return [""]
+
+    height, width = cell_size(precision)
+    # center of the cell holding the point, neighbours are one cell size away from it
+    center_lat = (math.floor((latitude + 90) / height) + 0.5) * height - 90
+    center_lon = (math.floor((longitude + 180) / width) + 0.5) * width - 180
+    cells = set()
+    for d_lat in (-1, 0, 1):
+        lat = center_lat + d_lat * height
+        if not -90 < lat < 90:
+            continue
+        for d_lon in (-1, 0, 1):
+            lon = (center_lon + d_lon * width + 180) % 360 - 180
+            cells.add(encode(lat, lon, precision))
+    return sorted(cells)
+
+
+def bounding_box(latitude: float, longitude: float, radius_km: float):
+    """Latitude range and longitude ranges of a box around every point within radius_km.
+
+    Longitude is split in two ranges when the box crosses the antimeridian,
+    and is None when the circle reaches a pole.
+    """
+    radius = radius_km / EARTH_RADIUS_KM
+    d_lat = math.degrees(radius)
+    min_lat, max_lat = latitude - d_lat, latitude + d_lat
+    if min_lat <= -90 or max_lat >= 90:
+        return max(min_lat, -90.0), min(max_lat, 90.0), None
+
+    # widest where the circle's meridian tangents touch it
+    d_lon = math.degrees(math.asin(math.sin(radius) / math.cos(math.radians(latitude))))
+    west, east = longitude - d_lon, longitude + d_lon
+    if west < -180:
+        return min_lat, max_lat, [(west + 360, 180.0), (-180.0, east)]
+    if east > 180:
+        return min_lat, max_lat, [(west, 180.0), (-180.0, east - 360)]
+    return min_lat, max_lat, [(west, east)]
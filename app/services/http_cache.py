@@ -0,0 +1,42 @@
+"""Conditional GETs: strong ETags, If-None-Match and Cache-Control.
+
+An ETag is a digest of whatever the response is built from, such as row
+versions and sync times, so it changes by itself whenever a sync or an
+admin edit changes the data and needs no separate invalidation. Routes
+check it before loading and serialising the response.
+"""
+import hashlib
+import os
+from typing import Optional
+
+from fastapi import Request, Response, status
+
+# Seconds clients may reuse a response before revalidating it
+HTTP_CACHE_MAX_AGE = int(os.getenv("HTTP_CACHE_MAX_AGE_SECONDS", "0"))
+
+
+def make_etag(*parts) -> str:
+    digest = hashlib.sha256("\x1f".join(str(part) for part in parts).encode()).hexdigest()
+    return f'"{digest[:32]}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # If-None-Match uses the weak comparison
+    return etag in {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+
+
+def conditional_response(request: Request, response: Response, etag: str) -> Optional[Response]:
+    """Return a 304 if the client already has etag, else add the caching headers to response."""
+    headers = {
+        "ETag": etag,
+        # responses are per user, shared caches must not keep them
+        "Cache-Control": f"private, max-age={HTTP_CACHE_MAX_AGE}, must-revalidate",
+    }
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    response.headers.update(headers)
+    return None
@@ -0,0 +1,285 @@
+"""Prometheus metrics, served in the text format by GET /metrics.
+
+Each route gets its RouteMetrics when the routes are instrumented at
+startup, so the label sets exist up front and recording a request only
+bumps counters on objects that are already there. What a request does
+along the way (SQL statements, database and Ticketmaster time) is added
+to its route's counters through a context variable holding the
+RouteMetrics, which reaches the threadpool and the spawned tasks the
+request runs.
+"""
+import hmac
+import os
+import time
+from contextvars import ContextVar
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.routing import Route
+
+from app.database.database import pool_stats
+from app.database.pool import TimedAsyncQueuePool, TimedQueuePool
+from app.services import password_pool
+from app.services.cache import attraction_cache, events_cache, search_cache
+from app.services.principal_cache import principal_cache
+from app.services.ratelimit import rate_limiter
+from app.services.timings import OperationTimings
+
+# Bearer token that lets Prometheus read /metrics; without it only admins can
+METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+
+PREFIX = "eventsphere"
+# Upper bounds of the histogram buckets, in seconds
+REQUEST_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, float("inf"))
+UPSTREAM_BUCKETS = (0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, float("inf"))
+STATUS_CLASSES = ("1xx", "2xx", "3xx", "4xx", "5xx")
+# Ticketmaster endpoints the client calls, other paths get their label sets on first use
+UPSTREAM_ENDPOINTS = ("/attractions.json", "/events.json")
+
+
+class RouteMetrics:
+    __slots__ = ("method", "path", "in_flight", "latency", "statements", "responses", "db_seconds", "upstream_seconds")
+
+    def __init__(self, method: str, path: str):
+        self.method = method
+        self.path = path
+        self.in_flight = 0
+        self.latency = OperationTimings(REQUEST_BUCKETS)
+        self.statements = 0
+        self.responses = [0] * len(STATUS_CLASSES)
+        self.db_seconds = 0.0
+        self.upstream_seconds = 0.0
+
+
+class UpstreamMetrics:
+    __slots__ = ("latency", "responses")
+
+    def __init__(self):
+        self.latency = OperationTimings(UPSTREAM_BUCKETS)
+        # status code, or "error" when no response came back
+        self.responses: dict = {}
+
+
+_current_route: ContextVar[Optional[RouteMetrics]] = ContextVar("metrics_route", default=None)
+route_metrics: list[RouteMetrics] = []
+upstream_metrics: dict[str, UpstreamMetrics] = {endpoint: UpstreamMetrics() for endpoint in UPSTREAM_ENDPOINTS}
+
+
+def _instrumented(route_app, metrics: RouteMetrics):
+    async def app(scope, receive, send):
+        responded = False
+
+        async def send_counting_status(message):
+            nonlocal responded
+            if message["type"] == "http.response.start":
+                responded = True
+                metrics.responses[min(max(message["status"] // 100, 1), 5) - 1] += 1
+            await send(message)
+
+        token = _current_route.set(metrics)
+        metrics.in_flight += 1
+        started = time.perf_counter()
+        try:
+            # the route's exception handlers run inside it, their responses go through send_counting_status
+            await route_app(scope, receive, send_counting_status)
+        finally:
+            metrics.latency.observe(time.perf_counter() - started)
+            metrics.in_flight -= 1
+            _current_route.reset(token)
+            if not responded:
+                # the exception reached ServerErrorMiddleware, which answers 500
+                metrics.responses[4] += 1
+
+    return app
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    route = _current_route.get()
+    if route is not None:
+        route.statements += 1
+        context._metrics_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, "_metrics_started", None)
+    if started is not None:
+        route = _current_route.get()
+        if route is not None:
+            route.db_seconds += time.perf_counter() - started
+
+
+def instrument(app) -> None:
+    """Start collecting metrics for every route of app and the SQL its requests run. Idempotent."""
+    if route_metrics:
+        return
+    for route in app.routes:
+        if isinstance(route, Route):
+            metrics = RouteMetrics(",".join(sorted(route.methods or ())), route.path)
+            route.app = _instrumented(route.app, metrics)
+            route_metrics.append(metrics)
+    # on the Engine class, so engines created later and the async engine's sync_engine are covered
+    event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def current_route() -> Optional[str]:
+    """Method and path of the route serving the running request."""
+    route = _current_route.get()
+    return f"{route.method} {route.path}" if route is not None else None
+
+
+def observe_upstream(path: str, status, seconds: float) -> None:
+    """Record a Ticketmaster call; status is the response's code or "error"."""
+    metrics = upstream_metrics.get(path)
+    if metrics is None:
+        metrics = upstream_metrics.setdefault(path, UpstreamMetrics())
+    metrics.latency.observe(seconds)
+    metrics.responses[status] = metrics.responses.get(status, 0) + 1
+    route = _current_route.get()
+    if route is not None:
+        route.upstream_seconds += seconds
+
+
+def authorized(authorization: Optional[str]) -> bool:
+    """Whether the request carries METRICS_TOKEN; never when it's unset, admins are checked by the route."""
+    if not METRICS_TOKEN:
+        return False
+    return hmac.compare_digest(authorization or "", f"Bearer {METRICS_TOKEN}")
+
+
+# ----- Text exposition -----
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + "}"
+
+
+class _Exposition:
+    def __init__(self):
+        self.lines: list[str] = []
+
+    def family(self, name: str, kind: str, help_text: str) -> str:
+        name = f"{PREFIX}_{name}"
+        self.lines.append(f"# HELP {name} {help_text}")
+        self.lines.append(f"# TYPE {name} {kind}")
+        return name
+
+    def sample(self, name: str, value, **labels) -> None:
+        self.lines.append(f"{name}{_labels(**labels)} {value}")
+
+    def histogram(self, name: str, timings: OperationTimings, **labels) -> None:
+        cumulative = 0
+        for bound, hits in zip(timings.bounds, timings.buckets):
+            cumulative += hits
+            self.sample(f"{name}_bucket", cumulative, **labels, le="+Inf" if bound == float("inf") else bound)
+        self.sample(f"{name}_sum", timings.total, **labels)
+        self.sample(f"{name}_count", timings.count, **labels)
+
+
+def render() -> str:
+    out = _Exposition()
+
+    name = out.family("http_requests_in_flight", "gauge", "Requests being served, by route.")
+    for route in route_metrics:
+        out.sample(name, route.in_flight, method=route.method, route=route.path)
+    name = out.family("http_request_duration_seconds", "histogram", "Request latency, by route.")
+    for route in route_metrics:
+        out.histogram(name, route.latency, method=route.method, route=route.path)
+    name = out.family("http_responses_total", "counter", "Responses by route and status class.")
+    for route in route_metrics:
+        for status_class, count in zip(STATUS_CLASSES, route.responses):
+            out.sample(name, count, method=route.method, route=route.path, status=status_class)
+    name = out.family(
+        "http_request_db_statements_total", "counter",
+        "SQL statements run by requests, by route. Divide by the request count for statements per request.",
+    )
+    for route in route_metrics:
+        out.sample(name, route.statements, method=route.method, route=route.path)
+    name = out.family("http_request_db_seconds_total", "counter", "Time requests spent in SQL statements, by route.")
+    for route in route_metrics:
+        out.sample(name, route.db_seconds, method=route.method, route=route.path)
+    name = out.family(
+        "http_request_upstream_seconds_total", "counter",
+        "Time requests spent in Ticketmaster calls, by route. Concurrent calls are each counted.",
+    )
+    for route in route_metrics:
+        out.sample(name, route.upstream_seconds, method=route.method, route=route.path)
+
+    name = out.family("ticketmaster_requests_total", "counter", "Ticketmaster Discovery API calls by endpoint and status.")
+    for endpoint, metrics in upstream_metrics.items():
+        for status, count in metrics.responses.items():
+            out.sample(name, count, endpoint=endpoint, status=status)
+    name = out.family("ticketmaster_request_duration_seconds", "histogram", "Ticketmaster Discovery API call latency.")
+    for endpoint, metrics in upstream_metrics.items():
+        out.histogram(name, metrics.latency, endpoint=endpoint)
+
+    limiter = rate_limiter.stats()
+    name = out.family("ticketmaster_daily_quota", "gauge", "Ticketmaster requests allowed per UTC day.")
+    out.sample(name, limiter["daily_quota"])
+    name = out.family("ticketmaster_daily_remaining", "gauge", "Ticketmaster requests left in the current UTC day.")
+    out.sample(name, limiter["daily_remaining"])
+    name = out.family("ticketmaster_rate_tokens", "gauge", "Tokens left in the per-second Ticketmaster token bucket.")
+    out.sample(name, limiter["tokens"])
+    name = out.family("ticketmaster_queued_requests", "gauge", "Ticketmaster requests waiting for a token.")
+    out.sample(name, limiter["queued"])
+    name = out.family("ticketmaster_throttled_total", "counter", "429 responses from Ticketmaster.")
+    out.sample(name, limiter["throttled"])
+
+    caches = (search_cache, events_cache, attraction_cache)
+    name = out.family("discovery_cache_hits_total", "counter", "Ticketmaster lookups answered from the cache, by cache.")
+    for cache in caches:
+        out.sample(name, cache.hits, cache=cache.name)
+    name = out.family("discovery_cache_negative_hits_total", "counter", "Cache hits on an empty result, by cache.")
+    for cache in caches:
+        out.sample(name, cache.negative_hits, cache=cache.name)
+    name = out.family("discovery_cache_misses_total", "counter", "Ticketmaster lookups that missed the cache, by cache.")
+    for cache in caches:
+        out.sample(name, cache.misses, cache=cache.name)
+
+    auth = principal_cache.stats()
+    name = out.family("auth_cache_hits_total", "counter", "Bearer tokens resolved from the principal cache.")
+    out.sample(name, auth["hits"])
+    name = out.family("auth_cache_misses_total", "counter", "Bearer tokens decoded and looked up in the database.")
+    out.sample(name, auth["misses"])
+    name = out.family("auth_cache_hit_ratio", "gauge", "Share of bearer token lookups answered by the principal cache.")
+    out.sample(name, auth["hit_rate"])
+    name = out.family("auth_cache_entries", "gauge", "Principals in the cache.")
+    out.sample(name, auth["entries"])
+    name = out.family("auth_cache_invalidations_total", "counter", "Users dropped from the principal cache.")
+    out.sample(name, auth["invalidations"])
+
+    name = out.family(
+        "password_duration_seconds", "histogram", "bcrypt hash and verify time, including the wait for a pool process."
+    )
+    for operation, timings in password_pool.timings.items():
+        out.histogram(name, timings, operation=operation)
+    password = password_pool.stats()
+    name = out.family("password_in_flight", "gauge", "bcrypt operations running or waiting for a process.")
+    out.sample(name, password["in_flight"])
+    name = out.family("password_rejected_total", "counter", "bcrypt operations rejected with a full pool.")
+    out.sample(name, password["rejected"])
+
+    pools = pool_stats()
+    for field, kind, help_text in (
+        ("size", "gauge", "Connections the pool keeps open."),
+        ("checked_out", "gauge", "Connections in use."),
+        ("overflow", "gauge", "Connections open beyond the pool size."),
+        ("connects", "counter", "New database connections."),
+        ("invalidations", "counter", "Connections discarded after an error."),
+        ("timeouts", "counter", "Checkouts that timed out waiting for a connection."),
+    ):
+        name = out.family(f"db_pool_{field}" + ("_total" if kind == "counter" else ""), kind, help_text)
+        for engine_name, stats in pools.items():
+            out.sample(name, stats[field], engine=engine_name)
+    name = out.family("db_pool_checkout_duration_seconds", "histogram", "Time to check out a connection.")
+    for engine_name, pool_class in (("sync", TimedQueuePool), ("async", TimedAsyncQueuePool)):
+        if engine_name in pools:
+            out.histogram(name, pool_class.counters.checkout, engine=engine_name)
+
+    return "\n".join(out.lines) + "\n"
@@ -0,0 +1,82 @@
+"""Dedicated process pool for bcrypt hashing and verification.
+
+Keeps CPU-bound password work off the shared AnyIO threadpool so a burst of
+logins can't starve every other sync endpoint. The pool has a fixed number
+of processes and a cap on in-flight operations; beyond it callers are
+rejected immediately with PasswordPoolBusy (503) instead of queueing.
+"""
+import asyncio
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+from app import auth
+from app.services.timings import OperationTimings
+
+PASSWORD_POOL_SIZE = int(os.getenv("PASSWORD_POOL_SIZE", "2"))
+# Operations running or waiting for a process before new ones are rejected
+PASSWORD_POOL_QUEUE_LIMIT = int(os.getenv("PASSWORD_POOL_QUEUE_LIMIT", "32"))
+
+_executor: Optional[ProcessPoolExecutor] = None
+_in_flight = 0
+_rejected = 0
+
+
+class PasswordPoolBusy(Exception):
+    """Raised when the password pool already has PASSWORD_POOL_QUEUE_LIMIT operations in flight."""
+
+
+timings = {"hash": OperationTimings(), "verify": OperationTimings()}
+
+
+def get_executor() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        # spawn rather than fork: the API process runs threads
+        _executor = ProcessPoolExecutor(
+            max_workers=PASSWORD_POOL_SIZE, mp_context=multiprocessing.get_context("spawn")
+        )
+    return _executor
+
+
+def shutdown() -> None:
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+async def _run(operation: str, fn, *args):
+    global _in_flight, _rejected
+    if _in_flight >= PASSWORD_POOL_QUEUE_LIMIT:
+        _rejected += 1
+        raise PasswordPoolBusy("Too many password operations in flight")
+    _in_flight += 1
+    started = time.perf_counter()
+    try:
+        return await asyncio.get_running_loop().run_in_executor(get_executor(), fn, *args)
+    finally:
+        _in_flight -= 1
+        # includes time spent waiting for a free process
+        timings[operation].observe(time.perf_counter() - started)
+
+
+async def hash_password(password: str) -> str:
+    return await _run("hash", auth.hash_password, password)
+
+
+async def verify_password(plain_password: str, hashed_password: str) -> tuple[bool, Optional[str]]:
+    """Return whether the password matches and, if the hash's cost factor is outdated, a rehash."""
+    return await _run("verify", auth.verify_and_update_password, plain_password, hashed_password)
+
+
+def stats() -> dict:
+    return {
+        "pool_size": PASSWORD_POOL_SIZE,
+        "queue_limit": PASSWORD_POOL_QUEUE_LIMIT,
+        "in_flight": _in_flight,
+        "rejected": _rejected,
+        **{operation: timing.stats() for operation, timing in timings.items()},
+    }
@@ -0,0 +1,152 @@
+"""Short-lived cache of bearer tokens to the authenticated user.
+
+Saves the JWT decode and the users lookup on every authenticated request.
+Entries are dropped when the user is updated or deleted, in this worker
+directly and in other workers through an optional Postgres LISTEN/NOTIFY
+channel (AUTH_CACHE_INVALIDATION_CHANNEL).
+"""
+import logging
+import os
+import select
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+from uuid import UUID
+
+from sqlalchemy import text
+from sqlalchemy.engine import make_url
+
+from app.schemas.schemas import Principal
+
+logger = logging.getLogger(__name__)
+
+AUTH_CACHE_TTL = float(os.getenv("AUTH_CACHE_TTL_SECONDS", "30"))
+AUTH_CACHE_MAX_ENTRIES = int(os.getenv("AUTH_CACHE_MAX_ENTRIES", "10000"))
+AUTH_CACHE_INVALIDATION_CHANNEL = os.getenv("AUTH_CACHE_INVALIDATION_CHANNEL")
+
+
+class PrincipalCache:
+    def __init__(self, ttl: float = AUTH_CACHE_TTL, max_entries: int = AUTH_CACHE_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._entries: OrderedDict[str, tuple[float, Principal, list[str]]] = OrderedDict()
+        # get_current_user runs on threadpool workers
+        self._lock = threading.Lock()
+
+    def get(self, token: str) -> Optional[tuple[Principal, list[str]]]:
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None or entry[0] <= time.time():
+                if entry is not None:
+                    del self._entries[token]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(token)
+            self.hits += 1
+            return entry[1], entry[2]
+
+    def set(self, token: str, principal: Principal, scopes: list[str], token_expires_at: Optional[float]) -> None:
+        expires_at = time.time() + self.ttl
+        if token_expires_at is not None:
+            # never outlive the token itself
+            expires_at = min(expires_at, token_expires_at)
+        with self._lock:
+            self._entries[token] = (expires_at, principal, scopes)
+            self._entries.move_to_end(token)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate_user(self, user_id) -> None:
+        user_id = str(user_id)
+        with self._lock:
+            stale = [token for token, (_, principal, _) in self._entries.items() if str(principal.id) == user_id]
+            for token in stale:
+                del self._entries[token]
+            self.invalidations += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "invalidations": self.invalidations,
+        }
+
+
+principal_cache = PrincipalCache()
+
+
+def invalidate_user(db, user_id: UUID) -> None:
+    """Drop cached principals of a user here and, if configured, in every other worker.
+
+    Call after committing the change; before it, a concurrent lookup could
+    cache the old row again. Commits the notification on its own.
+    """
+    if AUTH_CACHE_INVALIDATION_CHANNEL and db.get_bind().dialect.name == "postgresql":
+        db.execute(
+            text("SELECT pg_notify(:channel, :user_id)"),
+            {"channel": AUTH_CACHE_INVALIDATION_CHANNEL, "user_id": str(user_id)},
+        )
+        db.commit()
+    principal_cache.invalidate_user(user_id)
+
+
+async def invalidate_user_async(db, user_id: UUID) -> None:
+    """invalidate_user for an AsyncSession."""
+    if AUTH_CACHE_INVALIDATION_CHANNEL and db.get_bind().dialect.name == "postgresql":
+        await db.execute(
+            text("SELECT pg_notify(:channel, :user_id)"),
+            {"channel": AUTH_CACHE_INVALIDATION_CHANNEL, "user_id": str(user_id)},
+        )
+        await db.commit()
+    principal_cache.invalidate_user(user_id)
+
+
+def _listen(dsn: str, channel: str, stop: threading.Event) -> None:
+    import psycopg2
+    import psycopg2.extensions
+
+    while not stop.is_set():
+        try:
+            conn = psycopg2.connect(dsn)
+            conn.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+            with conn.cursor() as cursor:
+                cursor.execute(f'LISTEN "{channel}"')
+            # anything cached before we listened may have missed a notification
+            principal_cache.clear()
+            while not stop.is_set():
+                if select.select([conn], [], [], 1.0) == ([], [], []):
+                    continue
+                conn.poll()
+                while conn.notifies:
+                    principal_cache.invalidate_user(conn.notifies.pop(0).payload)
+            conn.close()
+        except Exception:
+            logger.exception("Principal cache invalidation listener failed, reconnecting")
+            stop.wait(5)
+
+
+def start_invalidation_listener(database_url: str) -> Optional[threading.Event]:
+    """Follow invalidations from other workers; returns the event that stops the listener."""
+    if not AUTH_CACHE_INVALIDATION_CHANNEL:
+        return None
+    url = make_url(database_url)
+    if url.get_backend_name() != "postgresql":
+        return None
+    dsn = url.set(drivername="postgresql").render_as_string(hide_password=False)
+    stop = threading.Event()
+    threading.Thread(
+        target=_listen, args=(dsn, AUTH_CACHE_INVALIDATION_CHANNEL, stop),
+        name="principal-cache-listener", daemon=True,
+    ).start()
+    return stop
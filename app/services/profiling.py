@@ -0,0 +1,233 @@
+"""Per-request sampling profiles and a slow-query log, for admins.
+
+An admin request sent with an `X-Profile: 1` header is sampled by a
+thread that exists only for that request: every PROFILE_INTERVAL_MS it
+records where the request is, the running stack when the request's task
+has the event loop and otherwise the chain of awaits it is suspended in,
+so time waiting on Ticketmaster or the database shows up too. Profiles
+are kept in memory as folded stacks, the input format of flamegraph.pl
+and speedscope, and fetched from /admin/profiles/{id}; the response
+names its profile in an X-Profile-Id header. Off unless PROFILING_ENABLED
+is set; then requests without the header pay for one header lookup.
+
+Statements slower than SLOW_QUERY_MS are logged with the route that ran
+them and the types of their bound parameters, never the values.
+"""
+import asyncio
+import functools
+import itertools
+import logging
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from datetime import datetime, timezone
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.requests import Request
+
+from app.services import metrics
+
+logger = logging.getLogger(__name__)
+
+# Serve X-Profile requests from admins, otherwise the middleware isn't installed at all
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "false").lower() == "true"
+PROFILE_INTERVAL = float(os.getenv("PROFILE_INTERVAL_MS", "5")) / 1000
+# Sampling stops after this long even if the request hasn't finished
+PROFILE_MAX_SECONDS = float(os.getenv("PROFILE_MAX_SECONDS", "60"))
+# Profiles kept for /admin/profiles, the oldest are dropped first
+PROFILE_KEEP = int(os.getenv("PROFILE_KEEP", "20"))
+# Requests profiled at the same time, further X-Profile requests are served unprofiled
+PROFILE_MAX_CONCURRENT = int(os.getenv("PROFILE_MAX_CONCURRENT", "2"))
+
+# Statements at least this slow are logged, 0 turns the log off
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "500"))
+SLOW_QUERY_KEEP = int(os.getenv("SLOW_QUERY_KEEP", "100"))
+SLOW_QUERY_MAX_STATEMENT = 2000
+# Bound parameters whose types are recorded, multi-row INSERTs bind thousands
+SLOW_QUERY_MAX_PARAMETERS = 20
+
+profiles: OrderedDict[str, "Profile"] = OrderedDict()
+slow_queries: deque = deque(maxlen=SLOW_QUERY_KEEP)
+_active = 0
+
+
+class Profile:
+    def __init__(self, method: str, path: str):
+        self.id = uuid.uuid4().hex[:12]
+        self.method = method
+        self.path = path
+        self.started_at = datetime.now(timezone.utc)
+        self.duration_ms = None
+        # folded stack -> samples
+        self.stacks: dict[str, int] = {}
+
+    def summary(self) -> dict:
+        return {
+            "id": self.id,
+            "method": self.method,
+            "path": self.path,
+            "started_at": self.started_at,
+            "duration_ms": self.duration_ms,
+            "samples": sum(self.stacks.values()),
+        }
+
+    def folded(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in sorted(self.stacks.items()))
+
+
+@functools.lru_cache(maxsize=4096)
+def _frame_label(code) -> str:
+    filename = code.co_filename
+    if "site-packages" in filename:
+        filename = filename.split("site-packages", 1)[1].lstrip(os.sep)
+    elif filename.startswith(os.getcwd()):
+        filename = os.path.relpath(filename)
+    return f"{code.co_name} ({filename}:{code.co_firstlineno})".replace(";", ":")
+
+
+def _await_chain(awaitable) -> list[str]:
+    labels = []
+    while awaitable is not None:
+        frame = (
+            getattr(awaitable, "cr_frame", None) or getattr(awaitable, "gi_frame", None)
+            or getattr(awaitable, "ag_frame", None)
+        )
+        if frame is None:
+            # a future: the request waits on IO, another task or the threadpool
+            labels.append(f"<awaiting {type(awaitable).__name__}>")
+            break
+        labels.append(_frame_label(frame.f_code))
+        awaitable = (
+            getattr(awaitable, "cr_await", None) or getattr(awaitable, "gi_yieldfrom", None)
+            or getattr(awaitable, "ag_await", None)
+        )
+    return labels
+
+
+class _Sampler(threading.Thread):
+    def __init__(self, profile: Profile, task: asyncio.Task):
+        super().__init__(name=f"profiler-{profile.id}", daemon=True)
+        self.profile = profile
+        self.coro = task.get_coro()
+        self.thread_id = threading.get_ident()
+        self.stopped = threading.Event()
+
+    def sample(self) -> list[str]:
+        root = self.coro.cr_frame
+        if root is None:
+            return []
+        # running: the loop thread's stack, from the task's coroutine down
+        running = []
+        frame = sys._current_frames().get(self.thread_id)
+        while frame is not None:
+            running.append(frame)
+            if frame is root:
+                return [_frame_label(frame.f_code) for frame in reversed(running)]
+            frame = frame.f_back
+        return _await_chain(self.coro)
+
+    def run(self) -> None:
+        deadline = time.monotonic() + PROFILE_MAX_SECONDS
+        stacks = self.profile.stacks
+        while not self.stopped.wait(PROFILE_INTERVAL) and time.monotonic() < deadline:
+            stack = self.sample()
+            if stack:
+                key = ";".join(stack)
+                stacks[key] = stacks.get(key, 0) + 1
+
+
+def _profile_requested(scope) -> bool:
+    for name, value in scope["headers"]:
+        if name == b"x-profile":
+            return value not in (b"", b"0", b"false")
+    return False
+
+
+class ProfilingMiddleware:
+    """Profiles requests sent with X-Profile by a caller authorize accepts."""
+
+    def __init__(self, app, authorize):
+        self.app = app
+        # async (Request) -> bool
+        self.authorize = authorize
+
+    async def __call__(self, scope, receive, send):
+        global _active
+        if (
+            scope["type"] != "http" or not _profile_requested(scope) or _active >= PROFILE_MAX_CONCURRENT
+            or not await self.authorize(Request(scope))
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        profile = Profile(scope["method"], scope["path"])
+
+        async def send_with_profile_id(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = [*message.get("headers", []), (b"x-profile-id", profile.id.encode())]
+            await send(message)
+
+        sampler = _Sampler(profile, asyncio.current_task())
+        _active += 1
+        started = time.perf_counter()
+        sampler.start()
+        try:
+            await self.app(scope, receive, send_with_profile_id)
+        finally:
+            profile.duration_ms = round((time.perf_counter() - started) * 1000, 2)
+            sampler.stopped.set()
+            # wakes at once; readers must not see samples still being added
+            sampler.join()
+            _active -= 1
+            profiles[profile.id] = profile
+            while len(profiles) > PROFILE_KEEP:
+                profiles.popitem(last=False)
+
+
+# ----- Slow query log -----
+
+def _parameter_shape(parameters):
+    if isinstance(parameters, dict):
+        first = itertools.islice(parameters.items(), SLOW_QUERY_MAX_PARAMETERS)
+        return {"count": len(parameters), "types": {name: type(value).__name__ for name, value in first}}
+    if isinstance(parameters, (list, tuple)):
+        if parameters and isinstance(parameters[0], (dict, list, tuple)):
+            # executemany
+            return {"rows": len(parameters), "row": _parameter_shape(parameters[0])}
+        first = parameters[:SLOW_QUERY_MAX_PARAMETERS]
+        return {"count": len(parameters), "types": [type(value).__name__ for value in first]}
+    return type(parameters).__name__
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context._slow_query_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed_ms = (time.perf_counter() - context._slow_query_started) * 1000
+    if elapsed_ms < SLOW_QUERY_MS:
+        return
+    entry = {
+        "at": datetime.now(timezone.utc),
+        "duration_ms": round(elapsed_ms, 2),
+        "route": metrics.current_route(),
+        "statement": statement[:SLOW_QUERY_MAX_STATEMENT],
+        "parameters": _parameter_shape(parameters),
+    }
+    slow_queries.append(entry)
+    logger.warning(
+        "Slow query, %.0f ms on %s: %s parameters=%s",
+        elapsed_ms, entry["route"] or "no route", " ".join(statement.split())[:200], entry["parameters"],
+    )
+
+
+def start_slow_query_log() -> None:
+    """Time every statement of every engine. Idempotent; does nothing with SLOW_QUERY_MS=0."""
+    if SLOW_QUERY_MS <= 0 or event.contains(Engine, "after_cursor_execute", _after_cursor_execute):
+        return
+    event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
@@ -0,0 +1,196 @@
+"""Quota-aware admission control for outbound Ticketmaster calls.
+
+Every Discovery API request waits for a token from a per-second token bucket
+and counts against a daily budget. Waiting requests are granted in priority
+order, so interactive lookups (search, follow) overtake background syncs,
+and background work is refused once the daily budget drops into the reserve
+kept for users.
+"""
+import asyncio
+import heapq
+import itertools
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
+from typing import Iterator, Optional
+
+RATE_PER_SECOND = float(os.getenv("TICKETMASTER_RATE_PER_SECOND", "5"))
+BURST = int(os.getenv("TICKETMASTER_BURST", "5"))
+DAILY_QUOTA = int(os.getenv("TICKETMASTER_DAILY_QUOTA", "5000"))
+# Share of the daily quota only interactive requests may use
+BACKGROUND_RESERVE = float(os.getenv("TICKETMASTER_BACKGROUND_RESERVE", "0.2"))
+
+INTERACTIVE = 0
+BACKGROUND = 10
+
+_priority: ContextVar[int] = ContextVar("discovery_request_priority", default=INTERACTIVE)
+
+
+@contextmanager
+def request_priority(priority: int) -> Iterator[None]:
+    """Run Discovery API calls made inside the block, and tasks it spawns, at this priority."""
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def current_priority() -> int:
+    return _priority.get()
+
+
+class QuotaExhausted(Exception):
+    """Raised when the daily Ticketmaster budget can't cover a request of this priority."""
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def delay(self) -> float:
+        """Seconds until a token is available."""
+        self._refill()
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+    def take(self) -> None:
+        self._refill()
+        self.tokens -= 1
+
+
+class DailyBudget:
+    """Requests left in the current UTC day."""
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.used = 0
+        self.day = datetime.now(timezone.utc).date()
+
+    def _roll(self) -> None:
+        today = datetime.now(timezone.utc).date()
+        if today != self.day:
+            self.day = today
+            self.used = 0
+
+    @property
+    def remaining(self) -> int:
+        self._roll()
+        return max(self.limit - self.used, 0)
+
+    def allows(self, priority: int) -> bool:
+        if priority >= BACKGROUND:
+            return self.remaining > self.limit * BACKGROUND_RESERVE
+        return self.remaining > 0
+
+    def seconds_until_reset(self) -> float:
+        now = datetime.now(timezone.utc)
+        midnight = now.replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(days=1)
+        return (midnight - now).total_seconds()
+
+    def consume(self) -> None:
+        self._roll()
+        self.used += 1
+
+    def observe_remaining(self, remaining: int) -> None:
+        # Ticketmaster's own count wins, it also sees other processes using the key
+        self._roll()
+        self.used = max(self.limit - remaining, 0)
+
+
+def parse_retry_after(value: Optional[str], default: float = 1.0) -> float:
+    if not value:
+        return default
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max((parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds(), 0.0)
+    except (TypeError, ValueError):
+        return default
+
+
+class DiscoveryRateLimiter:
+    def __init__(self, rate: float = RATE_PER_SECOND, burst: int = BURST, daily_quota: int = DAILY_QUOTA):
+        self.bucket = TokenBucket(rate, burst)
+        self.budget = DailyBudget(daily_quota)
+        self.paused_until = 0.0
+        self.throttled = 0
+        self._waiters: list[tuple[int, int, asyncio.Future]] = []
+        self._seq = itertools.count()
+        self._dispatcher: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    async def acquire(self, priority: int = None) -> None:
+        """Wait for permission to send one request; raise QuotaExhausted if the budget can't cover it."""
+        priority = current_priority() if priority is None else priority
+        if not self.budget.allows(priority):
+            raise QuotaExhausted(f"Daily Ticketmaster budget exhausted for priority {priority}")
+
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            # waiters from another (finished) event loop can never be granted
+            self._loop = loop
+            self._waiters = []
+            self._dispatcher = None
+
+        future = loop.create_future()
+        heapq.heappush(self._waiters, (priority, next(self._seq), future))
+        if self._dispatcher is None or self._dispatcher.done():
+            self._dispatcher = asyncio.create_task(self._dispatch())
+        try:
+            await future
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+
+    async def _dispatch(self) -> None:
+        while self._waiters:
+            delay = max(self.paused_until - time.monotonic(), self.bucket.delay())
+            if delay > 0:
+                # a higher priority waiter arriving meanwhile is served first
+                await asyncio.sleep(delay)
+                continue
+            priority, _, future = heapq.heappop(self._waiters)
+            if future.done():
+                continue
+            if not self.budget.allows(priority):
+                future.set_exception(QuotaExhausted(f"Daily Ticketmaster budget exhausted for priority {priority}"))
+                continue
+            self.bucket.take()
+            self.budget.consume()
+            future.set_result(None)
+
+    def pause(self, seconds: float) -> None:
+        """Hold all requests for a Retry-After period."""
+        self.throttled += 1
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+    def observe(self, headers) -> None:
+        remaining = headers.get("Rate-Limit-Available")
+        if remaining is not None and remaining.isdigit():
+            self.budget.observe_remaining(int(remaining))
+
+    def stats(self) -> dict:
+        return {
+            "daily_quota": self.budget.limit,
+            "daily_remaining": self.budget.remaining,
+            "tokens": round(self.bucket.tokens, 2),
+            "queued": sum(1 for _, _, future in self._waiters if not future.done()),
+            "paused_for_seconds": round(max(self.paused_until - time.monotonic(), 0.0), 2),
+            "throttled": self.throttled,
+        }
+
+
+rate_limiter = DiscoveryRateLimiter()
@@ -0,0 +1,109 @@
+"""Background refresh of followed artists ahead of SYNC_THRESHOLD expiry.
+
+Runs inside the API process when SYNC_SCHEDULER_ENABLED=true, or on its own
+with `python -m app.services.scheduler` (recommended with several workers).
+"""
+import asyncio
+import logging
+import os
+from datetime import datetime, timedelta, timezone
+
+from app.database import crud
+from app.services.discovery_client import (
+    DiscoveryAPIError, DiscoveryUnavailable, count_requests, start_client, close_client,
+)
+from app.services.ratelimit import BACKGROUND, request_priority
+from app.services.sync import SYNC_THRESHOLD, as_utc, sync_artist
+
+logger = logging.getLogger(__name__)
+
+SCHEDULER_ENABLED = os.getenv("SYNC_SCHEDULER_ENABLED", "false").lower() == "true"
+# Seconds between refresh cycles
+SCHEDULER_INTERVAL = float(os.getenv("SYNC_SCHEDULER_INTERVAL_SECONDS", "300"))
+# Refresh artists this long before their sync would expire
+SCHEDULER_REFRESH_AHEAD = timedelta(minutes=float(os.getenv("SYNC_SCHEDULER_REFRESH_AHEAD_MINUTES", "60")))
+# Ticketmaster requests one cycle may spend; the last artist started may overshoot by its remaining pages
+SCHEDULER_REQUEST_BUDGET = int(os.getenv("SYNC_SCHEDULER_REQUEST_BUDGET", "50"))
+
+
+def priority(followers: int, last_synced_at, now: datetime) -> float:
+    """Higher for artists with more followers and older data; never-synced artists come first."""
+    if last_synced_at is None:
+        return float("inf")
+    staleness_hours = (now - as_utc(last_synced_at)).total_seconds() / 3600
+    return followers * max(staleness_hours, 0.0)
+
+
+async def refresh_due_artists(budget: int = None) -> int:
+    """Run one refresh cycle and return how many artists were synced.
+
+    Ticketmaster calls run at BACKGROUND priority so user requests go first.
+    """
+    budget = SCHEDULER_REQUEST_BUDGET if budget is None else budget
+    now = datetime.now(timezone.utc)
+    due_before = now - (SYNC_THRESHOLD - SCHEDULER_REFRESH_AHEAD)
+
+    async with crud.session_scope() as db:
+        due = await crud.get_artists_due_for_sync(db, due_before)
+        due.sort(key=lambda row: priority(row.followers, row.Artist.last_synced_at, now), reverse=True)
+
+        # a failed sync rolls back, which expires every artist loaded here
+        artist_ids = [row.Artist.id for row in due]
+
+        synced = 0
+        for artist_id in artist_ids:
+            if budget <= 0:
+                break
+            artist = await crud.get_artist_by_id(db, artist_id)
+            if artist is None:
+                continue
+            with request_priority(BACKGROUND), count_requests() as used:
+                try:
+                    result = await sync_artist(db, artist)
+                    synced += 1
+                    logger.info("Scheduled sync of artist %s: %s", artist_id, result.report)
+                except DiscoveryUnavailable as exc:
+                    # out of quota or throttled: every other artist would fail the same way
+                    logger.warning("Scheduled syncs paused, Ticketmaster unavailable for %.0f s", exc.retry_after)
+                    break
+                except DiscoveryAPIError:
+                    logger.warning("Scheduled sync failed for artist %s", artist_id)
+            budget -= used[0]
+        return synced
+
+
+async def run_forever() -> None:
+    while True:
+        try:
+            synced = await refresh_due_artists()
+            logger.info("Scheduled refresh synced %d artists", synced)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Scheduled refresh cycle failed")
+        await asyncio.sleep(SCHEDULER_INTERVAL)
+
+
+def start() -> asyncio.Task:
+    return asyncio.create_task(run_forever())
+
+
+async def stop(task: asyncio.Task) -> None:
+    task.cancel()
+    try:
+        await task
+    except asyncio.CancelledError:
+        pass
+
+
+async def main() -> None:
+    await start_client()
+    try:
+        await run_forever()
+    finally:
+        await close_client()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main())
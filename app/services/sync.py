@@ -0,0 +1,120 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from uuid import UUID
+
+from app.database import crud
+from app.database.database import DbSession
+from app.database.database_handler import parse_event_date
+from app.models.models import Artist
+from app.schemas.schemas import EventResponse, SyncReport, SyncResult
+from app.services.discovery_client import iter_upcoming_event_pages, DiscoveryAPIError
+
+SYNC_THRESHOLD = timedelta(hours=12)
+
+# Syncs currently running in this process, keyed by artist id
+_inflight: dict[UUID, asyncio.Future] = {}
+
+
+def as_utc(value: datetime) -> datetime:
+    """A timezone-aware column value, which SQLite hands back naive; it was stored in UTC."""
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value
+
+
+def is_recently_synced(artist: Artist, threshold: timedelta = SYNC_THRESHOLD) -> bool:
+    if not artist.last_synced_at:
+        return False
+    return (datetime.now(timezone.utc) - as_utc(artist.last_synced_at)) < threshold
+
+
+def _snapshot(events) -> list[EventResponse]:
+    # Detach results from the leader's session so other requests can share them
+    return [EventResponse.model_validate(event) for event in events]
+
+
+async def _wait_for_other_workers(db: DbSession, artist: Artist, artist_id: UUID) -> Optional[SyncResult]:
+    """Take the cross-worker sync lock; reuse the stored events if another worker synced meanwhile."""
+    if not await crud.lock_artist_for_sync(db, artist_id):
+        return None
+    await crud.refresh(db, artist)
+    if not is_recently_synced(artist):
+        return None
+    events = _snapshot(await crud.get_upcoming_events_for_artist(db, artist_id))
+    # release the advisory lock
+    await crud.commit(db)
+    return SyncResult(events=events, report=SyncReport(unchanged=len(events)))
+
+
+async def _fetch_and_store(
+    db: DbSession, artist: Artist, artist_id: UUID, ticketmaster_id: Optional[str]
+) -> SyncResult:
+    reused = await _wait_for_other_workers(db, artist, artist_id)
+    if reused is not None:
+        return reused
+
+    report = SyncReport()
+    seen_tm_ids = []
+    if ticketmaster_id:
+        try:
+            seen_dates, truncated = [], False
+            async for events, truncated in iter_upcoming_event_pages(ticketmaster_id):
+                seen_tm_ids.extend(await crud.store_changed_events(db, artist_id, events, report))
+                seen_dates.extend(event["date"] for event in events if event.get("date"))
+            if not truncated:
+                report.removed = await crud.remove_events_missing_from_feed(db, artist_id, seen_tm_ids)
+            elif seen_dates:
+                # the feed is sorted by date and cut off: only earlier events were all listed
+                latest_seen = max(parse_event_date(date) for date in seen_dates)
+                report.removed = await crud.remove_events_missing_from_feed(
+                    db, artist_id, seen_tm_ids, before=latest_seen
+                )
+        except DiscoveryAPIError:
+            await crud.rollback(db)
+            # the rollback expired the artist; reload it so callers can keep using it
+            await crud.refresh(db, artist)
+            raise
+    events = _snapshot(await crud.mark_artist_synced(db, artist, seen_tm_ids))
+    return SyncResult(events=events, report=report)
+
+
+async def sync_artist(db: DbSession, artist: Artist) -> SyncResult:
+    """Fetch every page of an artist's upcoming events and apply the changes.
+
+    Each page is diffed against the stored content hashes as it arrives and
+    only new or changed events are upserted; upcoming events missing from the
+    complete feed are removed. Past Ticketmaster's 1000 event paging limit
+    only those dated before the last event listed are. All of it runs inside
+    one transaction that mark_artist_synced commits. Concurrent calls for the
+    same artist are coalesced: in this process they await the running sync,
+    across workers they queue on a Postgres advisory lock and reuse its
+    result. Raises
+    DiscoveryAPIError, after rolling back, if Ticketmaster fails part-way so
+    an incomplete sync is never stamped.
+    """
+    # a rollback expires the artist, and loading it again would be IO outside an await
+    artist_id, ticketmaster_id = artist.id, artist.ticketmaster_id
+    while (future := _inflight.get(artist_id)) is not None:
+        try:
+            return await asyncio.shield(future)
+        except asyncio.CancelledError:
+            # Only retry when the leader was cancelled, not this caller
+            if not future.cancelled() or asyncio.current_task().cancelling():
+                raise
+
+    future = asyncio.get_running_loop().create_future()
+    _inflight[artist_id] = future
+    try:
+        result = await _fetch_and_store(db, artist, artist_id, ticketmaster_id)
+    except asyncio.CancelledError:
+        future.cancel()
+        raise
+    except Exception as exc:
+        future.set_exception(exc)
+        # mark retrieved so a sync nobody else waited on doesn't log a warning
+        future.exception()
+        raise
+    else:
+        future.set_result(result)
+        return result
+    finally:
+        del _inflight[artist_id]
@@ -0,0 +1,33 @@
+"""Latency histogram for the stats endpoints."""
+
+# Upper bounds in seconds of the default histogram buckets
+TIMING_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, float("inf"))
+
+
+class OperationTimings:
+    def __init__(self, buckets: tuple = TIMING_BUCKETS):
+        self.bounds = buckets
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = [0] * len(buckets)
+
+    def observe(self, seconds: float) -> None:
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        for i, bound in enumerate(self.bounds):
+            if seconds <= bound:
+                self.buckets[i] += 1
+                break
+
+    def stats(self) -> dict:
+        return {
+            "count": self.count,
+            "mean_ms": round(1000 * self.total / self.count, 2) if self.count else 0.0,
+            "max_ms": round(1000 * self.max, 2),
+            "buckets": {
+                ("+Inf" if bound == float("inf") else str(bound)): hits
+                for bound, hits in zip(self.bounds, self.buckets)
+            },
+        }
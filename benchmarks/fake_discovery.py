@@ -0,0 +1,153 @@
+"""In-process stand-in for the Ticketmaster Discovery API, for benchmarks.
+
+Serves a seeded catalogue of artists and their upcoming events with the
+payload shape and size of the real API (venues, images, price ranges,
+classifications), after a configurable latency. Mount it with
+install(), which points discoveryapi.BASE_URL at it and gives the shared
+discovery client a transport that answers from it.
+"""
+import asyncio
+import random
+from datetime import datetime, timedelta, timezone
+from urllib.parse import urlsplit
+
+import httpx
+
+from app.services import discovery_client, discoveryapi
+
+BASE_URL = "http://discovery.bench/discovery/v2"
+
+CITIES = [
+    ("Berlin", "Germany", 52.52, 13.405), ("London", "Great Britain", 51.507, -0.128),
+    ("Paris", "France", 48.857, 2.352), ("New York", "United States Of America", 40.713, -74.006),
+    ("Chicago", "United States Of America", 41.878, -87.630), ("Toronto", "Canada", 43.653, -79.383),
+    ("Madrid", "Spain", 40.417, -3.704), ("Amsterdam", "Netherlands", 52.368, 4.904),
+    ("Sydney", "Australia", -33.869, 151.209), ("Tokyo", "Japan", 35.676, 139.650),
+]
+WORDS = ["Black", "Velvet", "Neon", "Echo", "Silver", "Wild", "Paper", "Midnight", "Golden", "Electric",
+         "Lunar", "Crimson", "Glass", "Iron", "Static", "Hollow", "Northern", "Burning", "Quiet", "Royal"]
+NOUNS = ["Wolves", "Lights", "Tigers", "Rivers", "Machines", "Hearts", "Giants", "Ghosts", "Kings", "Saints"]
+
+
+def _images(rng: random.Random, kind: str, item_id: str) -> list[dict]:
+    return [
+        {"ratio": ratio, "url": f"https://s1.ticketm.net/dam/{kind}/{item_id}_{ratio}_{width}.jpg",
+         "width": width, "height": width * 9 // 16, "fallback": False}
+        for ratio, width in (("16_9", 2048), ("16_9", 1024), ("3_2", 640), ("4_3", 305))
+    ]
+
+
+def _classification() -> list[dict]:
+    return [{
+        "primary": True,
+        "segment": {"id": "KZFzniwnSyZfZ7v7nJ", "name": "Music"},
+        "genre": {"id": "KnvZfZ7vAeA", "name": "Rock"},
+        "subGenre": {"id": "KZazBEonSMnZfZ7v6F1", "name": "Pop"},
+    }]
+
+
+class Catalogue:
+    """A seeded set of artists, each with events_per_artist upcoming events."""
+
+    def __init__(self, artists: int, events_per_artist: int, seed: int = 1):
+        rng = random.Random(seed)
+        now = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0)
+        self.attractions: dict[str, dict] = {}
+        self.events: dict[str, list[dict]] = {}
+        for i in range(artists):
+            attraction_id = f"K8vZ9{i:06d}"
+            name = f"{rng.choice(WORDS)} {rng.choice(NOUNS)} {i}"
+            self.attractions[attraction_id] = {
+                "name": name, "type": "attraction", "id": attraction_id, "test": False,
+                "url": f"https://www.ticketmaster.com/artist/{attraction_id}",
+                "locale": "en-us", "images": _images(rng, "attraction", attraction_id),
+                "classifications": _classification(), "upcomingEvents": {"_total": events_per_artist},
+            }
+            events = []
+            for j in range(events_per_artist):
+                city, country, lat, lon = rng.choice(CITIES)
+                event_id = f"G5v{i:06d}{j:04d}"
+                start = now + timedelta(days=rng.randint(1, 360), hours=rng.randint(0, 23))
+                events.append({
+                    "name": f"{name} - World Tour", "type": "event", "id": event_id, "test": False,
+                    "url": f"https://www.ticketmaster.com/event/{event_id}", "locale": "en-us",
+                    "images": _images(rng, "event", event_id),
+                    "dates": {
+                        "start": {"localDate": start.date().isoformat(), "dateTime": start.strftime("%Y-%m-%dT%H:%M:%SZ")},
+                        "timezone": "UTC", "status": {"code": "onsale"},
+                    },
+                    "classifications": _classification(),
+                    "priceRanges": [{"type": "standard", "currency": "USD",
+                                     "min": rng.randint(30, 90), "max": rng.randint(100, 400)}],
+                    "_embedded": {
+                        "venues": [{
+                            "name": f"{city} Arena {rng.randint(1, 5)}", "type": "venue",
+                            "id": f"KovZ{rng.randint(0, 99999):05d}", "postalCode": f"{rng.randint(10000, 99999)}",
+                            "city": {"name": city}, "country": {"name": country},
+                            "address": {"line1": f"{rng.randint(1, 500)} Main Street"},
+                            "location": {"latitude": f"{lat + rng.uniform(-0.1, 0.1):.6f}",
+                                         "longitude": f"{lon + rng.uniform(-0.1, 0.1):.6f}"},
+                        }],
+                        "attractions": [{"name": name, "type": "attraction", "id": attraction_id}],
+                    },
+                })
+            self.events[attraction_id] = sorted(events, key=lambda event: event["dates"]["start"]["dateTime"])
+        self.names = {attraction["name"]: attraction_id for attraction_id, attraction in self.attractions.items()}
+
+    def search(self, keyword: str) -> list[dict]:
+        keyword = keyword.casefold()
+        found = [attraction for attraction in self.attractions.values() if keyword in attraction["name"].casefold()]
+        # like Ticketmaster's relevance order, an exact name comes first
+        return sorted(found, key=lambda attraction: attraction["name"].casefold() != keyword)[:20]
+
+
+def _page(items: list, size: int, number: int) -> dict:
+    total_pages = -(-len(items) // size) if items else 0
+    return {"size": size, "totalElements": len(items), "totalPages": total_pages, "number": number}
+
+
+class FakeDiscovery:
+    """Answers Discovery API requests from a catalogue after latency_ms (±jitter)."""
+
+    def __init__(self, catalogue: Catalogue, latency_ms: float = 50.0, jitter: float = 0.25, seed: int = 1):
+        self.catalogue = catalogue
+        self.latency_ms = latency_ms
+        self.jitter = jitter
+        self.requests = 0
+        self._rng = random.Random(seed)
+
+    async def handle(self, request: httpx.Request) -> httpx.Response:
+        self.requests += 1
+        if self.latency_ms:
+            spread = self.latency_ms * self.jitter
+            await asyncio.sleep(max(0.0, self._rng.uniform(self.latency_ms - spread, self.latency_ms + spread)) / 1000)
+        path = urlsplit(str(request.url)).path
+        params = request.url.params
+        if path.endswith("/attractions.json"):
+            if "id" in params:
+                attraction = self.catalogue.attractions.get(params["id"])
+                found = [attraction] if attraction else []
+            else:
+                found = self.catalogue.search(params.get("keyword", ""))
+            body = {"page": _page(found, 20, 0)}
+            if found:
+                body["_embedded"] = {"attractions": found}
+            return httpx.Response(200, json=body)
+        if path.endswith("/events.json"):
+            events = self.catalogue.events.get(params.get("attractionId"), [])
+            size, number = int(params.get("size", 20)), int(params.get("page", 0))
+            page = events[number * size:(number + 1) * size]
+            body = {"page": _page(events, size, number)}
+            if page:
+                body["_embedded"] = {"events": page}
+            return httpx.Response(200, json=body)
+        return httpx.Response(404, json={"errors": [{"code": "DIS1004", "detail": "Resource not found"}]})
+
+
+def install(fake: FakeDiscovery) -> None:
+    """Send the app's Discovery API requests to fake instead of Ticketmaster."""
+    discoveryapi.BASE_URL = BASE_URL
+    discovery_client._client = httpx.AsyncClient(
+        transport=httpx.MockTransport(fake.handle),
+        timeout=httpx.Timeout(discoveryapi.REQUEST_TIMEOUT),
+    )
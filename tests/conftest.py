@@ -0,0 +1,7 @@
+import os
+import tempfile
+
+# Before any app import: the app reads its settings at import time
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'eventsphere_test.db')}"
+os.environ.setdefault("SECRET_KEY", "test")
+os.environ["SYNC_SCHEDULER_ENABLED"] = "false"
@@ -0,0 +1,134 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from app.services import cache
+from app.services.cache import InProcessBackend, KeyValueBackend, LocalKeyValueStore, TTLCache
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    # only the cache's clock, asyncio keeps the real one
+    monkeypatch.setattr(cache, "time", SimpleNamespace(monotonic=clock.monotonic))
+    return clock
+
+
+@pytest.fixture(autouse=True)
+def backend():
+    backend = InProcessBackend(max_entries=100)
+    cache.configure_backend(backend)
+    yield backend
+    cache.configure_backend(None)
+
+
+def load(value, calls: list):
+    async def loader():
+        calls.append(value)
+        return value
+    return loader
+
+
+def test_lru_evicts_least_recently_used():
+    backend = InProcessBackend(max_entries=2)
+
+    async def run():
+        await backend.set("a", [1], ttl=60)
+        await backend.set("b", [2], ttl=60)
+        # reading a makes b the least recently used
+        assert await backend.get("a") == [1]
+        await backend.set("c", [3], ttl=60)
+        return [await backend.get(key) for key in ("a", "b", "c")]
+
+    assert asyncio.run(run()) == [[1], cache._MISSING, [3]]
+    assert len(backend) == 2
+
+
+def test_entries_expire_after_ttl(clock):
+    search = TTLCache("search", ttl=300)
+    calls = []
+
+    async def run():
+        await search.get_or_load("metallica", load([{"id": "K1"}], calls))
+        clock.now += 299
+        await search.get_or_load("metallica", load([{"id": "K1"}], calls))
+        clock.now += 2
+        await search.get_or_load("metallica", load([{"id": "K2"}], calls))
+
+    asyncio.run(run())
+    assert calls == [[{"id": "K1"}], [{"id": "K2"}]]
+    assert (search.hits, search.misses) == (1, 2)
+
+
+def test_empty_results_are_cached_for_the_negative_ttl(clock):
+    search = TTLCache("search", ttl=300, negative_ttl=60)
+    calls = []
+
+    async def run():
+        assert await search.get_or_load("zz nope", load([], calls)) == []
+        clock.now += 59
+        assert await search.get_or_load("zz nope", load([], calls)) == []
+        clock.now += 2
+        assert await search.get_or_load("zz nope", load([], calls)) == []
+
+    asyncio.run(run())
+    assert len(calls) == 2
+    assert search.negative_hits == 1
+
+
+def test_failed_lookups_are_not_cached():
+    search = TTLCache("search", ttl=300)
+    calls = []
+
+    async def run():
+        assert await search.get_or_load("metallica", load(None, calls)) is None
+        assert await search.get_or_load("metallica", load(None, calls)) is None
+
+    asyncio.run(run())
+    assert len(calls) == 2
+
+
+def test_only_normalized_caches_fold_keys():
+    search = TTLCache("search", ttl=300, normalize_keys=True)
+    attraction = TTLCache("attraction", ttl=300)
+    calls = []
+
+    async def run():
+        await search.get_or_load("  Daft   PUNK ", load([{"id": "K1"}], calls))
+        await search.get_or_load("daft punk", load([{"id": "K1"}], calls))
+        await attraction.get_or_load("K8vZ9171", load([{"id": "K8vZ9171"}], calls))
+        await attraction.get_or_load("k8vz9171", load([{"id": "k8vz9171"}], calls))
+
+    asyncio.run(run())
+    assert calls == [[{"id": "K1"}], [{"id": "K8vZ9171"}], [{"id": "k8vz9171"}]]
+
+
+def test_key_value_backend_round_trips_json(clock):
+    store = LocalKeyValueStore()
+    cache.configure_backend(KeyValueBackend(store, prefix="test:"))
+    events = TTLCache("events", ttl=900)
+    calls = []
+    upcoming = [{"id": "G5v1", "name": "Show", "latitude": 52.52}]
+
+    async def run():
+        first = await events.get_or_load("K1", load(upcoming, calls))
+        second = await events.get_or_load("K1", load(upcoming, calls))
+        clock.now += 900
+        third = await events.get_or_load("K1", load(upcoming, calls))
+        return first, second, third
+
+    first, second, third = asyncio.run(run())
+    assert first == second == third == upcoming
+    # the second read came back from JSON, not the loader's object
+    assert second is not upcoming
+    assert len(calls) == 2
+    assert store.get("test:events:K1") is not None
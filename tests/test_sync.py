@@ -0,0 +1,145 @@
+import asyncio
+import uuid
+from datetime import datetime
+
+import httpx
+import pytest
+
+from app.database import crud, database
+from app.database.database import AsyncSessionLocal, Base, SessionLocal
+from app.models.models import Artist, Event, Interest, User
+from app.services import discovery_client, discoveryapi, scheduler, sync
+from app.services.discovery_client import DiscoveryAPIError
+from app.services.ratelimit import rate_limiter
+
+
+def events_page(number: int, total_pages: int = 2) -> dict:
+    return {
+        "_embedded": {"events": [{
+            "id": f"G5vTest{number:04d}", "name": "Test Show", "url": f"https://example.com/e/{number}",
+            "dates": {"start": {"dateTime": f"2099-06-{number + 1:02d}T20:00:00Z"}},
+        }]},
+        "page": {"size": 1, "totalElements": total_pages, "totalPages": total_pages, "number": number},
+    }
+
+
+@pytest.fixture(autouse=True)
+def tables():
+    Base.metadata.create_all(bind=database.get_engine())
+    yield
+    Base.metadata.drop_all(bind=database.get_engine())
+
+
+def use_upstream(failing_page=None, total_pages=2) -> None:
+    def handle(request: httpx.Request) -> httpx.Response:
+        number = int(request.url.params.get("page", 0))
+        if number == failing_page:
+            return httpx.Response(500, json={})
+        return httpx.Response(200, json=events_page(number, total_pages))
+
+    discovery_client._client = httpx.AsyncClient(transport=httpx.MockTransport(handle))
+
+
+async def sync_after_upstream_failure():
+    try:
+        return await _sync_after_upstream_failure()
+    finally:
+        # aiosqlite connections run on threads that would keep the test process alive
+        await database.dispose_engines()
+
+
+async def _sync_after_upstream_failure():
+    async with AsyncSessionLocal() as db:
+        artist = Artist(id=uuid.uuid4(), name="Test Artist", ticketmaster_id="K8vTest")
+        db.add(artist)
+        await db.commit()
+
+        # the first page is stored before the second fails, so the rollback expires the artist
+        use_upstream(failing_page=1)
+        with pytest.raises(DiscoveryAPIError):
+            await sync.sync_artist(db, artist)
+        assert not sync._inflight
+        assert artist.last_synced_at is None
+
+        use_upstream()
+        return await sync.sync_artist(db, artist)
+
+
+def test_async_sync_recovers_after_upstream_failure(monkeypatch):
+    monkeypatch.setattr(discoveryapi, "BASE_URL", "http://discovery.test")
+    result = asyncio.run(sync_after_upstream_failure())
+    assert [event.ticketmaster_id for event in result.events] == ["G5vTest0000", "G5vTest0001"]
+    assert result.report.inserted == 2
+
+
+async def scheduled_refresh_with_failing_artist():
+    try:
+        async with AsyncSessionLocal() as db:
+            fans = [User(id=uuid.uuid4(), name="Fan", email=f"fan{n}@example.com", password="x") for n in range(2)]
+            failing = Artist(id=uuid.uuid4(), name="Failing", ticketmaster_id="K8vFail")
+            working = Artist(id=uuid.uuid4(), name="Working", ticketmaster_id="K8vWork")
+            db.add_all([*fans, failing, working])
+            # more followers, so the failing artist is synced first
+            db.add_all([Interest(user_id=fan.id, artist_id=failing.id) for fan in fans])
+            db.add(Interest(user_id=fans[0].id, artist_id=working.id))
+            await db.commit()
+        return await scheduler.refresh_due_artists(budget=10)
+    finally:
+        await database.dispose_engines()
+
+
+def test_async_scheduler_continues_after_upstream_failure(monkeypatch):
+    monkeypatch.setattr(discoveryapi, "BASE_URL", "http://discovery.test")
+    monkeypatch.setattr(crud, "DB_ASYNC", True)
+
+    def handle(request: httpx.Request) -> httpx.Response:
+        number = int(request.url.params.get("page", 0))
+        if request.url.params["attractionId"] == "K8vFail" and number == 1:
+            return httpx.Response(500, json={})
+        return httpx.Response(200, json=events_page(number))
+
+    discovery_client._client = httpx.AsyncClient(transport=httpx.MockTransport(handle))
+    assert asyncio.run(scheduled_refresh_with_failing_artist()) == 1
+
+
+def test_truncated_feed_keeps_events_past_the_last_page(monkeypatch):
+    monkeypatch.setattr(discoveryapi, "BASE_URL", "http://discovery.test")
+    # the feed has three pages, only two of which can be fetched
+    monkeypatch.setattr(discoveryapi, "MAX_EVENT_PAGES", 2)
+    use_upstream(total_pages=3)
+
+    with SessionLocal() as db:
+        artist = Artist(id=uuid.uuid4(), name="Test Artist", ticketmaster_id="K8vTest")
+        db.add(artist)
+        db.add_all([
+            Event(artist_id=artist.id, ticketmaster_id="G5vGone", name="Cancelled", date=datetime(2099, 6, 1, 12)),
+            Event(artist_id=artist.id, ticketmaster_id="G5vLater", name="Unseen", date=datetime(2099, 7, 1, 20)),
+        ])
+        db.commit()
+
+        result = asyncio.run(sync.sync_artist(db, artist))
+        assert result.report.removed == 1
+        stored = {event.ticketmaster_id for event in db.query(Event).filter(Event.artist_id == artist.id)}
+        assert stored == {"G5vTest0000", "G5vTest0001", "G5vLater"}
+
+
+def test_scheduler_stops_when_the_daily_budget_is_spent(monkeypatch):
+    monkeypatch.setattr(discoveryapi, "BASE_URL", "http://discovery.test")
+    monkeypatch.setattr(rate_limiter.budget, "used", rate_limiter.budget.limit)
+    use_upstream()
+    attempts = []
+
+    async def counting_sync(db, artist):
+        attempts.append(artist.id)
+        return await sync.sync_artist(db, artist)
+
+    monkeypatch.setattr(scheduler, "sync_artist", counting_sync)
+    with SessionLocal() as db:
+        fan = User(id=uuid.uuid4(), name="Fan", email="fan@example.com", password="x")
+        artists = [Artist(id=uuid.uuid4(), name=f"Artist {n}", ticketmaster_id=f"K8v{n}") for n in range(3)]
+        db.add_all([fan, *artists])
+        db.add_all([Interest(user_id=fan.id, artist_id=artist.id) for artist in artists])
+        db.commit()
+
+    assert asyncio.run(scheduler.refresh_due_artists(budget=10)) == 0
+    assert len(attempts) == 1